@@ -1,43 +1,652 @@
 import os
+import time
+import uuid
+import heapq
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-import tiktoken  # 토큰 계산을 위한 tiktoken 라이브러리
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from chroma_store import (
+    CollectionCache, CollectionNotFound, EmbeddingModelMismatch, collection_name_for, create_client, list_venues,
+    parse_collection_name, parse_paper_id, search_by_vector, search_by_vectors, stored_embedding, venue_filter, venue_indexed,
+    warm_up
+)
+from bm25_index import LexicalIndex, reciprocal_rank_fusion
+from embedding_cache import EmbeddingCache, normalize_query
+from log_config import configure_logging
+from embedding_providers import create_embeddings, embedding_cost_per_token, embedding_model_tag
+from metrics import REGISTRY, Counter, Gauge, Histogram
+from result_cache import ResultCache
+from tokenization import count_tokens, count_tokens_batch
+from constants import (
+    BATCH_MAX_QUERIES, PRELOAD_COLLECTIONS, SEARCH_FANOUT_WORKERS, INDEX_LAYOUT, UNIFIED_COLLECTION_NAME, SEARCH_ENGINE,
+    SEARCH_EXECUTOR_WORKERS, MAX_IN_FLIGHT_REQUESTS, RETRY_AFTER_SECONDS, BM25_INDEX_DIR, HYBRID_CANDIDATES,
+    EMBEDDING_PROVIDER, OPENAI_EMBEDDING_CONTEXT_TOKENS
+)
+
+# 로그는 queue를 거쳐 별도 스레드에서 출력 (요청 경로에서 I/O를 하지 않음)
+configure_logging()
+logger = logging.getLogger("app")
+
+
+# 쿼리의 토큰 길이 제한 (최대 30,000 토큰까지만 허용)
+MAX_TOKENS_LIMIT = 30000
+
+
+# 응답에 포함할 수 있는 논문 필드
+PAPER_FIELDS = ("paper_id", "title", "authors", "abstract")
+DEFAULT_FIELDS = "title,authors,abstract"
+
+# in-flight 요청 수 제한을 적용하는 경로
+LIMITED_PATHS = ("/search-papers", "/similar")
+
+# 검색 방식: 임베딩(vector), BM25(lexical), 두 결과의 reciprocal-rank fusion(hybrid)
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+
+class Paper(BaseModel):
+    paper_id: Optional[str] = None
+    title: Optional[str] = None
+    authors: Optional[str] = None
+    abstract: Optional[str] = None
+    score: float
+    conference: Optional[str] = None
+    year: Optional[int] = None
+
+
+class SearchResponse(BaseModel):
+    total_tokens_used: int
+    cost: float
+    cached: bool
+    searched: Optional[List[str]] = None
+    results: List[Paper]
 
-from langchain_community.vectorstores import Chroma
-from langchain.embeddings.openai import OpenAIEmbeddings
 
-from constants import OPENAI_EMBEDDING_MODEL_NAME, COST_PER_TOKEN, CHROMA_DB_DIR
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    conference: str = 'NeurIPS'
+    year: int = 2024
+    recall_top_k: int = 10
+    fields: str = DEFAULT_FIELDS
 
-openai_api_key = os.getenv("OPENAI_API_KEY")
 
-# Set up logging configuration
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+class QueryResult(BaseModel):
+    total_tokens_used: int
+    cost: float
+    cached: bool
+    results: List[Paper]
 
 
-def count_tokens(text):
-    tokenizer = tiktoken.encoding_for_model(OPENAI_EMBEDDING_MODEL_NAME)
-    tokens = tokenizer.encode(text)
-    return len(tokens)
+class BatchSearchResponse(BaseModel):
+    total_tokens_used: int
+    cost: float
+    results: List[QueryResult]
+
+
+class SimilarResponse(BaseModel):
+    paper_id: str
+    searched: List[str]
+    results: List[Paper]
+
+
+def parse_fields(fields):
+    # 쉼표로 구분된 필드 목록을 검증하여 tuple로 반환
+    requested = tuple(field.strip() for field in fields.split(",") if field.strip())
+    unknown = [field for field in requested if field not in PAPER_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Unknown fields {unknown}. Supported fields: {', '.join(PAPER_FIELDS)}.")
+    return requested
+
+
+def check_mode(mode):
+    # 검색 방식을 검증하고, BM25 인덱스가 필요한데 없으면 400 응답
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{mode}'. Supported modes: {', '.join(SEARCH_MODES)}.")
+    if mode != "vector" and lexical_index is None:
+        raise HTTPException(status_code=400, detail=f"mode={mode} requires the BM25 index; build it with make_bm25.py.")
+    return mode
+
+
+def token_limit_response(tokens_used):
+    # 토큰 제한을 넘으면 400 응답을, 아니면 None을 반환
+    if tokens_used > MAX_TOKENS_LIMIT:
+        return JSONResponse(
+            status_code=400, 
+            content={"message": f"Query exceeds the maximum token limit of {MAX_TOKENS_LIMIT}. Your query contains {tokens_used} tokens."}
+        )
+    return None
 
 
 # Initialize FastAPI app
 app = FastAPI()
 
 
-# OpenAI embeddings을 사용하여 벡터 생성
-embeddings = OpenAIEmbeddings(
-    openai_api_key=openai_api_key,
-    model=OPENAI_EMBEDDING_MODEL_NAME
+# 설정된 provider(OpenAI 또는 로컬 모델)의 embeddings을 사용하여 벡터 생성
+# (OpenAI 클라이언트가 이벤트 루프에서 tiktoken으로 쿼리를 다시 나누지 않도록 길이 확인을 끔)
+embeddings = create_embeddings(check_embedding_ctx_length=False)
+# 모델의 context보다 길 수 있는 쿼리는 길이 확인을 켠 클라이언트가 나누어 임베딩 (cpu_executor에서 실행)
+long_query_embeddings = create_embeddings() if EMBEDDING_PROVIDER == "openai" else embeddings
+embedding_model = embedding_model_tag()
+cost_per_token = embedding_cost_per_token()
+
+# 프로세스 전체에서 공유하는 Chroma client와 collection 캐시
+chroma_client = create_client()
+collection_cache = CollectionCache(chroma_client, embedding_model)
+
+# 토큰 계산과 인덱스 검색 같은 CPU 작업을 이벤트 루프 밖에서 실행하는 전용 executor
+cpu_executor = ThreadPoolExecutor(max_workers=SEARCH_EXECUTOR_WORKERS)
+
+
+
+def fits_context(text):
+    # UTF-8 바이트 수는 토큰 수의 상한이므로, 토큰을 세지 않고도 context에 들어가는지 알 수 있음
+    return len(text.encode("utf-8")) <= OPENAI_EMBEDDING_CONTEXT_TOKENS
+
+
+async def aembed_query(text):
+    """Embed ``text`` on the async client, or in the CPU executor when it may exceed the model's context."""
+    if fits_context(text):
+        return await embeddings.aembed_query(text)
+    return await run_blocking(long_query_embeddings.embed_query, text)
+
+
+async def aembed_documents(texts):
+    """Embed ``texts`` like ``aembed_query``: short ones in one async call, possibly long ones in the CPU executor."""
+    short = [index for index, text in enumerate(texts) if fits_context(text)]
+    long = [index for index, text in enumerate(texts) if not fits_context(text)]
+    vectors = [None] * len(texts)
+    if short:
+        for index, vector in zip(short, await embeddings.aembed_documents([texts[index] for index in short])):
+            vectors[index] = vector
+    if long:
+        long_vectors = await run_blocking(long_query_embeddings.embed_documents, [texts[index] for index in long])
+        for index, vector in zip(long, long_vectors):
+            vectors[index] = vector
+    return vectors
+
+
+# 동일한 쿼리를 다시 임베딩하지 않도록 쿼리 임베딩 캐시 사용
+# (embeddings의 async 클라이언트로 await하고 SQLite 조회와 저장은 cpu_executor에서 실행하여 이벤트 루프를 막지 않음)
+embedding_cache = EmbeddingCache(aembed_query, aembed_documents, model_name=embedding_model, executor=cpu_executor)
+
+# 동일한 /search-papers 요청의 single-flight 처리와 짧은 TTL 결과 캐시
+result_cache = ResultCache()
+
+# 여러 collection을 동시에 검색하기 위한 thread pool
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_FANOUT_WORKERS)
+
+# 현재 처리 중인 검색 요청 수 (이벤트 루프에서만 변경)
+in_flight_requests = 0
+
+# Prometheus 형식으로 /metrics에 노출하는 지표
+REQUEST_COUNT = Counter("http_requests_total", "HTTP requests by route and status code.", ("method", "path", "status"))
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "path"))
+STAGE_SECONDS = Histogram("search_stage_duration_seconds", "Latency of each stage of a search request.", ("stage",))
+QUERY_TOKENS = Counter("search_query_tokens_total", "Query tokens counted by search requests.", ("conference", "year"))
+EMBEDDING_COST = Counter(
+    "search_embedding_cost_dollars_total", "Dollars paid to embed search queries.", ("conference", "year")
+)
+SEARCH_ERRORS = Counter("search_errors_total", "Search requests that failed, by endpoint and error.", ("endpoint", "error"))
+
+
+def cache_stats():
+    return {
+        "collection": collection_cache.stats(),
+        "embedding": embedding_cache.stats(),
+        "result": result_cache.stats(),
+    }
+
+
+Gauge(
+    "cache_hit_ratio", "Hit rate of the in-process caches.", ("cache",),
+    fn=lambda: {(name,): stats["hit_rate"] for name, stats in cache_stats().items()}
+)
+Counter(
+    "cache_hits_total", "Hits of the in-process caches (coalesced requests count as result cache hits).", ("cache",),
+    fn=lambda: {
+        (name,): stats.get("hits", stats.get("memory_hits", 0) + stats.get("disk_hits", 0)) + stats.get("coalesced", 0)
+        for name, stats in cache_stats().items()
+    }
 )
+Counter(
+    "cache_misses_total", "Misses of the in-process caches.", ("cache",),
+    fn=lambda: {(name,): stats["misses"] for name, stats in cache_stats().items()}
+)
+Gauge("search_requests_in_flight", "Search requests being served.", fn=lambda: {(): in_flight_requests})
+
+# make_bm25.py로 만든 BM25 인덱스가 있으면 시작할 때 로드 (mode=lexical, mode=hybrid에 사용)
+lexical_index = None
+if os.path.exists(os.path.join(BM25_INDEX_DIR, "manifest.json")):
+    lexical_index = LexicalIndex(BM25_INDEX_DIR)
+
+# 시작 시 warm-up 진행 상태 (/ready에서 사용)
+warm_up_status = {"ready": False, "collections": 0, "warmed": 0, "failed": [], "seconds": None, "error": None}
+
+# 요청별 단계 소요 시간 (Server-Timing 헤더에 사용)
+request_timings = contextvars.ContextVar("request_timings", default=None)
+
+# SEARCH_ENGINE=numpy이면 export_numpy.py로 내보낸 행렬에서 정확한(brute-force) 검색
+numpy_index = None
+if SEARCH_ENGINE == "numpy":
+    from numpy_index import NumpyIndex
+    numpy_index = NumpyIndex(embedding_model)
+
+
+@contextmanager
+def stage(name):
+    """Record the wall time of a search stage in ``STAGE_SECONDS`` and in the current request's timings."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def search_errors(endpoint):
+    """
+    Turn an exception raised by a search endpoint into an HTTP error and count it in ``SEARCH_ERRORS``.
+
+    ``CollectionNotFound`` becomes HTTP 404, ``EmbeddingModelMismatch`` HTTP 409 and
+    any other error HTTP 500; ``HTTPException`` passes through unchanged.
+    """
+    try:
+        yield
+    except HTTPException:
+        raise
+    except CollectionNotFound as e:
+        # 색인되지 않은 학회/연도는 오류로 집계하지 않음
+        raise HTTPException(status_code=404, detail=str(e))
+    except EmbeddingModelMismatch as e:
+        # collection과 쿼리의 임베딩 모델이 다르면 결과가 의미 없으므로 거절
+        logger.error("Embedding model mismatch: %s", e)
+        SEARCH_ERRORS.inc(endpoint=endpoint, error=type(e).__name__)
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        # Raise an HTTP 500 error if something goes wrong
+        logger.exception("Error occurred: %s", e)
+        SEARCH_ERRORS.inc(endpoint=endpoint, error=type(e).__name__)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def record_usage(conference, year, tokens_used, cost, found=True):
+    """
+    Add the query tokens and embedding dollars of a search to the per-venue counters.
+
+    Only venues that returned results (``found``) get their own label; the rest are
+    counted as ``unknown`` so arbitrary request values cannot add new time series.
+    """
+    if not found:
+        conference, year = "unknown", "unknown"
+    QUERY_TOKENS.inc(tokens_used, conference=conference, year=year)
+    EMBEDDING_COST.inc(cost, conference=conference, year=year)
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run ``fn`` in the CPU executor and await its result without blocking the event loop."""
+    # 요청의 context(단계별 시간 기록)를 작업 스레드에서도 사용할 수 있도록 복사
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        cpu_executor, functools.partial(context.run, fn, *args, **kwargs)
+    )
+
+
+async def embed_query(query, tokens_used):
+    """Embed ``query`` through the embedding cache and return ``(embedding, cost, cached)``."""
+    # 쿼리 임베딩 (캐시에 있으면 API를 호출하지 않음)
+    with stage("embedding"):
+        query_embedding, cached = await embedding_cache.aget_or_embed(query)
+
+    # 비용 계산 (캐시된 임베딩을 재사용하면 비용 없음)
+    total_cost = 0 if cached else tokens_used * cost_per_token
+
+    # 토큰 수와 비용 출력 (DEBUG가 꺼져 있으면 메시지를 만들지 않음)
+    logger.debug("Query embedding: %d tokens, cached %s, cost $%.6f", tokens_used, cached, total_cost)
+    return query_embedding, total_cost, cached
+
+
+def search_venue(conference, year, query_embeddings, k, with_abstract=True):
+    """
+    Search one venue with every embedding of ``query_embeddings``.
+
+    Returns one ``[(Document, score)]`` list per query embedding. The unified layout
+    selects the venue through a metadata filter.
+    """
+    if numpy_index is not None:
+        with stage("vector_search"):
+            candidates = numpy_index.search_many([(conference, year)], query_embeddings, k)
+        return [[(result, score) for score, _, _, result in query_candidates] for query_candidates in candidates]
+
+    with stage("collection_open"):
+        if INDEX_LAYOUT == "unified":
+            collection = collection_cache.get_by_name(UNIFIED_COLLECTION_NAME)
+            search_filter = venue_filter([conference], [year])
+        else:
+            collection = collection_cache.get(conference, year)
+            search_filter = None
+    with stage("vector_search"):
+        return search_by_vectors(collection, query_embeddings, k=k, filter=search_filter, with_abstract=with_abstract)
+
+
+def select_venues(conferences, year_from, year_to, mode="vector"):
+    # 요청한 학회(None이면 전부)와 연도 범위에 해당하는 (conference, year) 목록
+    # (lexical 모드는 BM25 인덱스만 검색하므로 BM25 인덱스의 venue에서 선택)
+    if mode == "lexical":
+        known_venues = lexical_index.venues
+    elif INDEX_LAYOUT == "unified" and numpy_index is None:
+        # unified collection에 실제로 논문이 있는 학회/연도만 선택 (per-venue 레이아웃과 같은 404)
+        with stage("collection_open"):
+            collection = collection_cache.get_by_name(UNIFIED_COLLECTION_NAME)
+        return [
+            (conference, year) for conference in sorted(set(conferences)) for year in range(year_from, year_to + 1)
+            if venue_indexed(collection, conference, year)
+        ]
+    else:
+        known_venues = numpy_index.venues if numpy_index is not None else list_venues(chroma_client)
+    return [
+        (conference, year) for conference, year in known_venues
+        if (conferences is None or conference in conferences) and year_from <= year <= year_to
+    ]
+
+
+def require_venue(conference, year, mode="vector"):
+    """Raise ``CollectionNotFound`` unless ``conference``/``year`` is indexed for ``mode``."""
+    if mode == "lexical":
+        known = (conference, year) in lexical_index.venues
+    elif numpy_index is not None:
+        known = (conference, year) in numpy_index.venues
+    elif INDEX_LAYOUT == "unified":
+        with stage("collection_open"):
+            collection = collection_cache.get_by_name(UNIFIED_COLLECTION_NAME)
+        known = venue_indexed(collection, conference, year)
+    else:
+        # 없는 collection은 열리지 않고 CollectionNotFound를 발생시킴
+        with stage("collection_open"):
+            collection_cache.get(conference, year)
+        return
+    if not known:
+        raise CollectionNotFound(f"No index found for {conference} {year}.")
+
+
+def search_venues(venues, query_embedding, k, with_abstract=True):
+    """
+    Search ``venues`` (``(conference, year)`` pairs) with ``query_embedding`` and return the global top ``k``.
+
+    Each candidate is a ``(score, conference, year, Document)`` tuple. With the
+    per-venue layout every collection is searched concurrently and the per-collection
+    top ``k`` lists are merged with a heap; with the unified layout a single search
+    is filtered by the conference/year metadata. With ``SEARCH_ENGINE=numpy`` the
+    exact numpy index is searched instead of Chroma.
+    """
+    if numpy_index is not None:
+        with stage("vector_search"):
+            return numpy_index.search(venues, query_embedding, k)
+
+    if INDEX_LAYOUT == "unified":
+        with stage("collection_open"):
+            collection = collection_cache.get_by_name(UNIFIED_COLLECTION_NAME)
+        conferences = sorted({conference for conference, _ in venues})
+        years = sorted({year for _, year in venues})
+        with stage("vector_search"):
+            results = search_by_vector(
+                collection, query_embedding, k=k, filter=venue_filter(conferences, years), with_abstract=with_abstract
+            )
+        return [
+            (score, result.metadata["conference"], int(result.metadata["year"]), result)
+            for result, score in results
+        ]
+
+    def search_collection(venue):
+        with stage("collection_open"):
+            collection = collection_cache.get(*venue)
+        with stage("vector_search"):
+            return venue, search_by_vector(collection, query_embedding, k=k, with_abstract=with_abstract)
+
+    if len(venues) == 1:
+        (conference, year), results = search_collection(venues[0])
+        return [(score, conference, year, result) for result, score in results]
+
+    # 각 collection의 top K를 동시에 검색한 뒤 heap으로 전체 top K를 선택
+    futures = [search_executor.submit(contextvars.copy_context().run, search_collection, venue) for venue in venues]
+    candidates = []
+    for (conference, year), results in (future.result() for future in futures):
+        for result, score in results:
+            candidates.append((score, conference, year, result))
+    return heapq.nlargest(k, candidates, key=lambda candidate: candidate[0])
+
+
+def find_stored_embedding(paper_id):
+    """Return the embedding stored at indexing time for ``paper_id``, or None if the paper is not indexed."""
+    venue = parse_paper_id(paper_id)
+    if venue is None:
+        return None
+    if numpy_index is not None:
+        return numpy_index.embedding(venue, paper_id)
+    try:
+        if INDEX_LAYOUT == "unified":
+            return stored_embedding(collection_cache.get_by_name(UNIFIED_COLLECTION_NAME), paper_id)
+        return stored_embedding(collection_cache.get(*venue), paper_id)
+    except CollectionNotFound:
+        return None
+
+
+def search_candidates(mode, venues, query, query_embedding, k, with_abstract=True):
+    """
+    Return the global top ``k`` of ``venues`` for ``mode`` as ``(score, conference, year, Document)`` tuples.
+
+    ``lexical`` ranks by BM25 and needs no ``query_embedding``. ``hybrid`` takes
+    ``HYBRID_CANDIDATES`` results from both the vector and the BM25 search and fuses
+    them with reciprocal-rank fusion; the score is then the fused score.
+    """
+    if mode == "lexical":
+        with stage("lexical_search"):
+            return lexical_index.search(venues, query, k)
+
+    num_candidates = k if mode == "vector" else max(k, HYBRID_CANDIDATES)
+    vector_candidates = search_venues(venues, query_embedding, num_candidates, with_abstract=with_abstract)
+    if mode == "vector":
+        return vector_candidates
+
+    with stage("lexical_search"):
+        lexical_candidates = lexical_index.search(venues, query, num_candidates)
+    return reciprocal_rank_fusion([vector_candidates, lexical_candidates], k)
+
+
+def build_paper(result, score, fields):
+    # page_content를 파싱하지 않고 metadata에서 바로 응답을 구성
+    paper = {field: result.metadata.get(field) for field in fields}
+    paper["score"] = score
+    return paper
+
+
+def warm_up_collection_names():
+    # PRELOAD_COLLECTIONS 중 실제로 존재하는 collection ("all"이면 전부)
+    if INDEX_LAYOUT == "unified" and numpy_index is None:
+        return [UNIFIED_COLLECTION_NAME] if PRELOAD_COLLECTIONS else []
+    venues = numpy_index.venues if numpy_index is not None else list_venues(chroma_client)
+    # 최근 연도부터 warm-up
+    venues = sorted(venues, key=lambda venue: venue[1], reverse=True)
+    names = [collection_name_for(*venue) for venue in venues]
+    if PRELOAD_COLLECTIONS != ["all"]:
+        selected = {name if name.endswith("_collection") else f"{name}_collection" for name in PRELOAD_COLLECTIONS}
+        names = [name for name in names if name in selected]
+    if numpy_index is None and len(names) > collection_cache.maxsize:
+        # LRU보다 많이 열면 먼저 warm-up한 collection이 다시 닫히므로 캐시 크기까지만 warm-up
+        logger.warning(
+            "Warming up only %d of %d collections (COLLECTION_CACHE_SIZE)", collection_cache.maxsize, len(names)
+        )
+        names = names[:collection_cache.maxsize]
+    return names
 
 
-@app.post("/search-papers")
-def search_papers(
+def warm_up_collection(collection_name):
+    # 성공 여부를 반환 (실패해도 나머지 collection의 warm-up은 계속)
+    try:
+        if numpy_index is not None:
+            numpy_index.warm_up(parse_collection_name(collection_name))
+        else:
+            warm_up(collection_cache.get_by_name(collection_name))
+        return True
+    except Exception as e:
+        logger.error("Warm-up of %s failed: %s", collection_name, e)
+        return False
+
+
+def warm_up_service():
+    """
+    Load the tokenizer, open the configured collections and run a synthetic query against each one.
+
+    The queries reuse stored embeddings, so warm-up calls no embedding API. ``/ready``
+    reports ready once this returns, even if some collections failed to warm up.
+    """
+    start = time.perf_counter()
+    # tiktoken BPE 파일을 첫 요청 전에 미리 로드
+    count_tokens("warm up")
+
+    collection_names = warm_up_collection_names()
+    warm_up_status["collections"] = len(collection_names)
+    succeeded = list(search_executor.map(warm_up_collection, collection_names))
+    warm_up_status["warmed"] = sum(succeeded)
+    warm_up_status["failed"] = [name for name, ok in zip(collection_names, succeeded) if not ok]
+
+    warm_up_status["seconds"] = round(time.perf_counter() - start, 3)
+    warm_up_status["ready"] = True
+    logger.info("Warm-up finished: %s", warm_up_status)
+
+
+def warm_up_done(task):
+    # warm-up 자체가 실패하면 (예: Chroma를 열 수 없음) /ready가 계속 503을 반환하고 실패 이유를 보고
+    if task.cancelled() or task.exception() is None:
+        return
+    error = task.exception()
+    logger.error("Warm-up failed: %s", error, exc_info=error)
+    warm_up_status["error"] = f"{type(error).__name__}: {error}"
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    # 서버는 바로 요청을 받되, warm-up이 끝날 때까지 /ready는 503을 반환
+    app.state.warm_up_task = asyncio.create_task(run_blocking(warm_up_service))
+    app.state.warm_up_task.add_done_callback(warm_up_done)
+
+
+@app.middleware("http")
+async def limit_in_flight_requests(request: Request, call_next):
+    """
+    Reject search requests with HTTP 503 and ``Retry-After`` once ``MAX_IN_FLIGHT_REQUESTS`` are being served.
+
+    Failing fast lets clients back off instead of queueing until they time out.
+    """
+    global in_flight_requests
+    if not request.url.path.startswith(LIMITED_PATHS) or not MAX_IN_FLIGHT_REQUESTS:
+        return await call_next(request)
+
+    if in_flight_requests >= MAX_IN_FLIGHT_REQUESTS:
+        logger.warning("Rejecting %s: %d requests in flight", request.url.path, in_flight_requests)
+        return JSONResponse(
+            status_code=503,
+            content={"message": "The server is busy, please retry later."},
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
+    in_flight_requests += 1
+    try:
+        return await call_next(request)
+    finally:
+        in_flight_requests -= 1
+
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """
+    Count and time every request, and tag the response with ``X-Request-ID`` and ``Server-Timing`` headers.
+
+    An incoming ``X-Request-ID`` is kept so slow requests can be correlated across services;
+    ``Server-Timing`` lists the total time and the time spent in each search stage.
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    timings = {}
+    request_timings.set(timings)
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    # 경로 템플릿으로 집계하여 label 수가 늘어나지 않도록 함
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    REQUEST_COUNT.inc(method=request.method, path=path, status=response.status_code)
+    REQUEST_SECONDS.observe(elapsed, method=request.method, path=path)
+
+    response.headers["X-Request-ID"] = request_id
+    response.headers["Server-Timing"] = ", ".join(
+        [f"total;dur={elapsed * 1000:.1f}"] + [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    )
+    logger.info(
+        "%s %s %d %.1fms", request.method, request.url.path, response.status_code, elapsed * 1000,
+        extra={"request_id": request_id},
+    )
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Return the service metrics in the Prometheus text exposition format.
+
+    Includes request counts and latency per route, per-stage search latency histograms
+    (`collection_open`, `token_counting`, `embedding`, `embedding_lookup`, `vector_search`, `lexical_search`,
+    `response_building`), query tokens and embedding dollars per conference/year, search errors and cache hit rates.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: HTTP 200 once the startup warm-up has finished, HTTP 503 before.
+
+    The body reports how many collections were warmed up, which ones failed and how long it took.
+    If the warm-up itself failed, the probe keeps returning HTTP 503 and ``error`` says why.
+    """
+    status = {**warm_up_status, "failed": list(warm_up_status["failed"])}
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
+@app.get("/stats")
+def stats():
+    """
+    Return runtime statistics of the search service (collection, embedding and result cache hits/misses,
+    and the number of `/search-papers` requests coalesced onto an identical in-flight request).
+    """
+    return {
+        "collection_cache": collection_cache.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "result_cache": result_cache.stats(),
+        "in_flight_requests": in_flight_requests,
+    }
+
+
+@app.post("/search-papers", response_model=SearchResponse, response_model_exclude_none=True)
+async def search_papers(
     query: str, 
     conference: str = 'NeurIPS', 
     year: int = 2024, 
     recall_top_k: int = 10,  
+    fields: str = DEFAULT_FIELDS,
+    mode: str = "vector",
 ):
     """
     API to search for papers by conference and year and return top K results.
@@ -66,6 +675,14 @@ def search_papers(
     - conference (str): The name of the conference. Must be one of the supported conferences.
     - year (int): The year of the conference. Must be one of the supported years.
     - recall_top_k (int, optional): The number of top results to return. 
+    - fields (str, optional): Comma-separated paper fields to return, among `paper_id`, `title`,
+      `authors` and `abstract` (default: `title,authors,abstract`). Use `fields=title,authors`
+      to leave abstracts out of the response for large `recall_top_k` (Chroma still returns
+      each result's whole metadata, so this does not reduce what is read from the index).
+    - mode (str, optional): `vector` (default) ranks by embedding similarity. `lexical` ranks by
+      BM25 over titles and abstracts without embedding the query (no cost; good for exact method
+      names and acronyms such as "LoRA"). `hybrid` fuses both rankings with reciprocal-rank fusion.
+      `lexical` and `hybrid` require the index built by `make_bm25.py`.
 
     Example Usage:
     You can use this API to find similar papers by providing the abstract or key concepts
@@ -85,8 +702,11 @@ def search_papers(
     Expected Response:
     The API returns a JSON object with the following fields:
     - total_tokens_used (int): The total number of tokens used in the query.
-    - cost (float): The cost associated with embedding the query.
-    - results (list of dict): A list of papers and their metadata, including:
+    - cost (float): The cost associated with embedding the query (0 when a cached embedding is reused).
+    - cached (bool): Whether the query embedding was served from the embedding cache, or the whole
+      response was shared with an identical recent or concurrent request (its cost is then 0).
+    - results (list of dict): A list of papers and their metadata, including (depending on `fields`):
+        - paper_id (str): The stable id of the paper.
         - title (str): The title of the paper.
         - authors (str): The authors of the paper.
         - abstract (str): The abstract of the paper.
@@ -97,6 +717,7 @@ def search_papers(
     {
         "total_tokens_used": 168,
         "cost": 0.00000336,
+        "cached": false,
         "results": [
             {
                 "title": "Towards a Scalable Reference-Free Evaluation of Generative Models",
@@ -119,66 +740,267 @@ def search_papers(
     papers based on a given abstract or paper description.
     """
 
-    try:
-        # 학회와 연도에 맞게 다른 collection_name 사용
-        collection_name = f"{conference}_{year}_collection"
-        
-        # Chroma 벡터 스토어 생성 (학회와 연도별로 컬렉션 이름을 다르게 함)
-        chroma_vector = Chroma(
-            collection_name=collection_name,  # 학회와 연도에 맞는 컬렉션
-            embedding_function=embeddings,
-            persist_directory=CHROMA_DB_DIR,
-            collection_metadata={"hnsw:space": "cosine"}
-        )
-
-        # 쿼리의 토큰 수 계산
-        tokens_used = count_tokens(query)
+    requested_fields = parse_fields(fields)
+    check_mode(mode)
 
-        # 쿼리의 토큰 길이 제한 (최대 30,000 토큰까지만 허용)
-        max_tokens_limit = 30000
-        if tokens_used > max_tokens_limit:
-            return JSONResponse(
-                status_code=400, 
-                content={"message": f"Query exceeds the maximum token limit of {max_tokens_limit}. Your query contains {tokens_used} tokens."}
-            )
+    async def search():
+        # 색인되지 않은 학회/연도는 쿼리를 임베딩하기 전에 404
+        await run_blocking(require_venue, conference, year, mode)
 
-        # 비용 계산 (text-embedding-3-large의 경우 1M 토큰당 $0.130)
-        total_cost = tokens_used * COST_PER_TOKEN
+        # lexical 모드는 임베딩을 사용하지 않으므로 토큰과 비용이 없음
+        tokens_used, total_cost, cached, query_embedding = 0, 0, False, None
+        if mode != "lexical":
+            # 쿼리의 토큰 수 계산
+            with stage("token_counting"):
+                tokens_used = await run_blocking(count_tokens, query)
+            error_response = token_limit_response(tokens_used)
+            if error_response is not None:
+                return error_response
 
-        # 토큰 수와 비용 출력
-        logging.info(f"Tokens used for query: {tokens_used}")
-        logging.info(f"Cost for embedding the query: ${total_cost:.6f}")
+            query_embedding, total_cost, cached = await embed_query(query, tokens_used)
 
-        # 유사도 검색 작업 (필터 추가)
-        results = chroma_vector.similarity_search_with_relevance_scores(
-            query=query,
-            k=recall_top_k
+        # 유사도 검색 작업 (unified 레이아웃에서는 metadata 필터로 학회와 연도를 선택)
+        candidates = await run_blocking(
+            search_candidates, mode, [(conference, year)], query, query_embedding, recall_top_k,
+            with_abstract="abstract" in requested_fields
         )
+        results = [(result, score) for score, _, _, result in candidates]
+        if mode != "lexical":
+            record_usage(conference, year, tokens_used, total_cost, found=bool(results))
 
         # 결과가 있는지 확인
         if not results:
-            logging.info(f"No results found for source file: {conference}_{year}.json")
+            logger.info("No results found for %s %s", conference, year)
             return JSONResponse(status_code=404, content={"message": f"No results found for {conference} {year}."})
 
-        # 결과를 dict로 변환하여 반환 (title, authors, abstract 분리)
-        papers = []
-        for result, score in results:
-            # 페이지 내용을 파싱하여 title, authors, abstract를 추출
-            content_lines = result.page_content.split("\n")
-            title = content_lines[0].replace("Title: ", "")
-            authors = content_lines[1].replace("Authors: ", "")
-            abstract = content_lines[2].replace("Abstract: ", "")
-            
-            papers.append({
-                "title": title,
-                "authors": authors,
-                "abstract": abstract,
-                "score": score,
-            })
-
-        return {"total_tokens_used": tokens_used, "cost": total_cost, "results": papers}
+        # 결과를 dict로 변환하여 반환 (요청한 필드만 포함)
+        with stage("response_building"):
+            papers = [build_paper(result, score, requested_fields) for result, score in results]
 
-    except Exception as e:
-        # Raise an HTTP 500 error if something goes wrong
-        logging.error(f"Error occurred: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        return {"total_tokens_used": tokens_used, "cost": total_cost, "cached": cached, "results": papers}
+
+    with search_errors("/search-papers"):
+        # 동시에 들어온 동일한 요청은 하나의 검색을 공유하고, 성공한 응답은 잠시 캐시
+        key = (normalize_query(query), conference, year, recall_top_k, requested_fields, mode)
+        response, shared = await result_cache.get_or_compute(
+            key, search, cacheable=lambda response: isinstance(response, dict)
+        )
+        if shared and isinstance(response, dict):
+            # 임베딩 비용은 실제로 계산한 요청에만 집계
+            response = {**response, "cost": 0, "cached": True}
+        return response
+
+
+@app.post("/search-papers/multi", response_model=SearchResponse, response_model_exclude_none=True)
+async def search_papers_multi(
+    query: str,
+    conferences: List[str] = Query(['ICML', 'NeurIPS', 'ICLR']),
+    year_from: int = 2018,
+    year_to: int = 2024,
+    recall_top_k: int = 10,
+    fields: str = DEFAULT_FIELDS,
+    mode: str = "vector",
+):
+    """
+    API to search for papers across several conferences and years in a single request.
+
+    The query is embedded once and searched concurrently in every
+    `{conference}_{year}_collection` matching `conferences` and the inclusive
+    `year_from` ~ `year_to` range. The per-collection top K lists are merged into
+    one global top K.
+
+    Parameters:
+    - query (str): The search query, typically an abstract or title of a paper.
+    - conferences (list of str): The conferences to search (repeat the parameter for each one).
+    - year_from (int): The first year to search (inclusive).
+    - year_to (int): The last year to search (inclusive).
+    - recall_top_k (int, optional): The number of top results to return.
+    - fields (str, optional): Comma-separated paper fields to return (see `/search-papers`).
+    - mode (str, optional): `vector`, `lexical` or `hybrid` (see `/search-papers`).
+
+    Expected Response:
+    Same fields as `/search-papers`, plus:
+    - searched (list of str): The `{conference}_{year}` venues that were searched.
+    - results[].conference (str), results[].year (int): The venue each paper comes from.
+    """
+
+    requested_fields = parse_fields(fields)
+    check_mode(mode)
+
+    with search_errors("/search-papers/multi"):
+        venues = await run_blocking(select_venues, conferences, year_from, year_to, mode)
+        if not venues:
+            return JSONResponse(status_code=404, content={"message": f"No collections found for {conferences} {year_from}~{year_to}."})
+
+        tokens_used, total_cost, cached, query_embedding = 0, 0, False, None
+        if mode != "lexical":
+            # 쿼리의 토큰 수 계산
+            with stage("token_counting"):
+                tokens_used = await run_blocking(count_tokens, query)
+            error_response = token_limit_response(tokens_used)
+            if error_response is not None:
+                return error_response
+
+            # 쿼리는 한 번만 임베딩
+            query_embedding, total_cost, cached = await embed_query(query, tokens_used)
+            # 여러 학회에 걸친 검색은 요청 값 대신 고정된 label로 집계
+            record_usage("multi", "multi", tokens_used, total_cost)
+
+        top_candidates = await run_blocking(
+            search_candidates, mode, venues, query, query_embedding, recall_top_k,
+            with_abstract="abstract" in requested_fields
+        )
+
+        if not top_candidates:
+            return JSONResponse(status_code=404, content={"message": f"No results found for {conferences} {year_from}~{year_to}."})
+
+        with stage("response_building"):
+            papers = []
+            for score, conference, year, result in top_candidates:
+                paper = build_paper(result, score, requested_fields)
+                paper["conference"] = conference
+                paper["year"] = year
+                papers.append(paper)
+
+        return {
+            "total_tokens_used": tokens_used,
+            "cost": total_cost,
+            "cached": cached,
+            "searched": [f"{conference}_{year}" for conference, year in venues],
+            "results": papers,
+        }
+
+
+@app.post("/search-papers/batch", response_model=BatchSearchResponse, response_model_exclude_none=True)
+async def search_papers_batch(request: BatchSearchRequest):
+    """
+    API to search for papers with many queries in a single call.
+
+    All queries that are not in the embedding cache are embedded with one
+    provider call, and the similarity searches for the given conference and
+    year run as one vectorized batch. Every query must respect the same token
+    limit as `/search-papers`.
+
+    Request Body:
+    - queries (list of str): The search queries (at most `BATCH_MAX_QUERIES`, 500 by default).
+    - conference (str), year (int), recall_top_k (int), fields (str): Same as `/search-papers`.
+
+    Expected Response:
+    - total_tokens_used (int), cost (float): Totals over all queries (cached embeddings cost nothing).
+    - results (list of dict): One entry per query, in input order, with its own
+      `total_tokens_used`, `cost`, `cached` and `results` (same paper fields as `/search-papers`).
+    """
+
+    requested_fields = parse_fields(request.fields)
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="At least one query is required.")
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_QUERIES} queries are allowed per batch.")
+
+    with search_errors("/search-papers/batch"):
+        # 색인되지 않은 학회/연도는 쿼리를 임베딩하기 전에 404
+        await run_blocking(require_venue, request.conference, request.year)
+
+        # 쿼리별 토큰 수 계산 및 제한 확인
+        with stage("token_counting"):
+            tokens_used = await run_blocking(count_tokens_batch, request.queries)
+        too_long = [index for index, tokens in enumerate(tokens_used) if tokens > MAX_TOKENS_LIMIT]
+        if too_long:
+            return JSONResponse(
+                status_code=400,
+                content={"message": f"Queries {too_long} exceed the maximum token limit of {MAX_TOKENS_LIMIT}."}
+            )
+
+        # 캐시에 없는 쿼리들을 한 번의 API 호출로 임베딩
+        with stage("embedding"):
+            embedded = await embedding_cache.aget_or_embed_many(request.queries)
+        query_embeddings = [embedding for embedding, _ in embedded]
+        costs = [0 if cached else tokens * cost_per_token for (_, cached), tokens in zip(embedded, tokens_used)]
+        logger.debug("Batch of %d queries: %d tokens, cost $%.6f", len(request.queries), sum(tokens_used), sum(costs))
+
+        # 모든 쿼리를 한 번에 검색
+        all_results = await run_blocking(
+            search_venue, request.conference, request.year, query_embeddings, request.recall_top_k,
+            with_abstract="abstract" in requested_fields
+        )
+        record_usage(request.conference, request.year, sum(tokens_used), sum(costs), found=any(all_results))
+
+        with stage("response_building"):
+            query_results = [
+                {
+                    "total_tokens_used": tokens,
+                    "cost": cost,
+                    "cached": cached,
+                    "results": [build_paper(result, score, requested_fields) for result, score in results],
+                }
+                for tokens, cost, (_, cached), results in zip(tokens_used, costs, embedded, all_results)
+            ]
+        return {"total_tokens_used": sum(tokens_used), "cost": sum(costs), "results": query_results}
+
+
+@app.get("/similar/{paper_id}", response_model=SimilarResponse, response_model_exclude_none=True)
+async def similar_papers(
+    paper_id: str,
+    conferences: Optional[List[str]] = Query(None),
+    year_from: int = 2018,
+    year_to: int = 2024,
+    recall_top_k: int = 10,
+    fields: str = DEFAULT_FIELDS,
+):
+    """
+    API to find papers similar to a paper that is already indexed ("more like this").
+
+    The embedding stored for `paper_id` when it was indexed is used directly as the
+    query, so no embedding provider is called and the request costs nothing. The
+    venues matching `conferences` and `year_from` ~ `year_to` are searched concurrently
+    and the source paper is excluded from the results.
+
+    Parameters:
+    - paper_id (str): The stable id of the paper, as returned with `fields=paper_id`
+      (`{conference}_{year}_{hash}`).
+    - conferences (list of str, optional): The conferences to search (default: all indexed
+      conferences; required with `INDEX_LAYOUT=unified`).
+    - year_from (int), year_to (int): The inclusive range of years to search.
+    - recall_top_k (int, optional): The number of similar papers to return.
+    - fields (str, optional): Comma-separated paper fields to return (see `/search-papers`).
+
+    Expected Response:
+    - paper_id (str): The source paper.
+    - searched (list of str): The `{conference}_{year}` venues that were searched.
+    - results (list of dict): The similar papers with their `score`, `conference` and `year`.
+    """
+
+    requested_fields = parse_fields(fields)
+    if conferences is None and INDEX_LAYOUT == "unified" and numpy_index is None:
+        raise HTTPException(status_code=400, detail="conferences is required with the unified index layout.")
+
+    with search_errors("/similar/{paper_id}"):
+        with stage("embedding_lookup"):
+            embedding = await run_blocking(find_stored_embedding, paper_id)
+        if embedding is None:
+            return JSONResponse(status_code=404, content={"message": f"Paper '{paper_id}' is not indexed."})
+
+        venues = await run_blocking(select_venues, conferences, year_from, year_to)
+        if not venues:
+            return JSONResponse(status_code=404, content={"message": f"No collections found for {conferences} {year_from}~{year_to}."})
+
+        # 원본 논문이 결과에 포함될 수 있으므로 하나 더 검색한 뒤 제외
+        top_candidates = await run_blocking(
+            search_venues, venues, embedding, recall_top_k + 1, with_abstract="abstract" in requested_fields
+        )
+
+        with stage("response_building"):
+            papers = []
+            for score, conference, year, result in top_candidates:
+                if result.metadata.get("paper_id") == paper_id:
+                    continue
+                paper = build_paper(result, score, requested_fields)
+                paper["conference"] = conference
+                paper["year"] = year
+                papers.append(paper)
+
+        return {
+            "paper_id": paper_id,
+            "searched": [f"{conference}_{year}" for conference, year in venues],
+            "results": papers[:recall_top_k],
+        }
@@ -0,0 +1,2 @@
+# Benchmarks for the paper recommender. Run them from the repository root, e.g.
+#     python -m benchmarks.index_layout
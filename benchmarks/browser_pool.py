@@ -0,0 +1,163 @@
+"""
+Crawl a local static site through the browser pool of the paper spiders and report pages per second.
+
+Run from the repository root (needs scrapy, scrapy-selenium and a chromedriver):
+
+    python -m benchmarks.browser_pool --pages 40 --pool-sizes 1 4
+
+Every page fills in its abstract from JavaScript after --render-delay ms, so
+each request waits for the browser like the ieee and ismir abstract pages. One
+crawl is run per pool size; size 1 is what ``scrapy_selenium.SeleniumMiddleware``
+did. A last crawl fetches the same pages flagged ``render_js: False``, which
+skip the browser and go through Scrapy's downloader.
+
+Without a browser, ``--fake-browser-latency 0.5`` replaces every browser with
+one that downloads the page with urllib and then sleeps that many seconds.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import functools
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "paper_spider"))
+
+PAGE = """<html><body><h1 id="title">Paper {index}</h1><p id="authors">Author {index}</p><div id="content"></div>
+<script>setTimeout(function () {{
+  document.getElementById("content").innerHTML = '<p id="abstract">Abstract of paper {index}.</p>';
+}}, {delay});</script></body></html>
+"""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_pages(directory, pages, delay):
+    for index in range(pages):
+        with open(os.path.join(directory, f"paper_{index}.html"), 'w', encoding='utf-8') as f:
+            f.write(PAGE.format(index=index, delay=delay))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class FakeDriver:
+    """Stand-in for a WebDriver that downloads the page and sleeps instead of rendering it."""
+
+    latency = 0.5
+
+    def __init__(self):
+        self.page_source = ""
+        self.current_url = ""
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as response:
+            self.page_source = response.read().decode("utf-8")
+        self.current_url = url
+        time.sleep(self.latency)
+
+    def find_element(self, by, value):
+        return self
+
+    def quit(self):
+        pass
+
+
+def create_fake_driver(settings):
+    return FakeDriver()
+
+
+def build_spider(base_url, pages, render_js):
+    import scrapy
+    from scrapy_selenium import SeleniumRequest
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    class StaticSiteSpider(scrapy.Spider):
+        name = "browser_pool_benchmark"
+
+        def start_requests(self):
+            for index in range(pages):
+                yield SeleniumRequest(
+                    url=f"{base_url}/paper_{index}.html",
+                    callback=self.parse,
+                    wait_time=10,
+                    wait_until=EC.presence_of_element_located((By.ID, "abstract")) if render_js else None,
+                    meta={"render_js": render_js},
+                )
+
+        def parse(self, response):
+            yield {
+                "title": response.css("#title::text").get(),
+                "authors": response.css("#authors::text").get(),
+                "abstract": response.css("#abstract::text").get(),
+            }
+
+    return StaticSiteSpider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--render-delay", type=int, default=200, help="ms until the page's JavaScript adds the abstract")
+    parser.add_argument("--fake-browser-latency", type=float,
+                        help="use a fake browser that sleeps this many seconds per page instead of Chrome")
+    args = parser.parse_args()
+
+    from scrapy.crawler import Crawler, CrawlerProcess
+    from scrapy.settings import Settings
+    from scrapy.utils.reactor import install_reactor
+    from paper_spider import settings as project_settings
+
+    settings = Settings()
+    settings.setmodule(project_settings)
+    settings.set("SPIDER_MODULES", [])
+    settings.set("ROBOTSTXT_OBEY", False)
+    settings.set("HTTPCACHE_ENABLED", False)
+    settings.set("LOG_LEVEL", "ERROR")
+    # 페이지 수만 세므로 논문 검증/중복 제거 pipeline은 끔
+    settings.set("ITEM_PIPELINES", {})
+    if args.fake_browser_latency is not None:
+        FakeDriver.latency = args.fake_browser_latency
+        settings.set("BROWSER_POOL_DRIVER_FACTORY", create_fake_driver)
+
+    runs = [(f"browser pool of {size}", size, True) for size in args.pool_sizes] + [("render_js: False", 1, False)]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        server = serve_pages(directory, args.pages, args.render_delay)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        process = CrawlerProcess(settings)
+        install_reactor(settings["TWISTED_REACTOR"])
+        from twisted.internet import defer, reactor
+
+        @defer.inlineCallbacks
+        def run_all():
+            for label, size, render_js in runs:
+                crawler_settings = settings.copy()
+                crawler_settings.set("BROWSER_POOL_SIZE", size)
+                crawler = Crawler(build_spider(base_url, args.pages, render_js), crawler_settings)
+                start = time.monotonic()
+                yield process.crawl(crawler)
+                stats = crawler.stats.get_stats()
+                results.append((label, stats.get("item_scraped_count", 0), stats.get("browser_pool/request_count", 0),
+                                time.monotonic() - start))
+
+        run_all().addBoth(lambda _: reactor.stop())
+        process.start(stop_after_crawl=False)
+        server.shutdown()
+
+    print(f"{'run':<22} {'items':>6} {'rendered':>9} {'time (s)':>9} {'pages/s':>8}")
+    for label, items, rendered, seconds in results:
+        print(f"{label:<22} {items:>6} {rendered:>9} {seconds:>9.2f} {items / seconds:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
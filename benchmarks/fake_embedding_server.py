@@ -0,0 +1,133 @@
+"""
+Local stand-in for the OpenAI embeddings endpoint, for exercising the indexer and the API offline.
+
+    python -m benchmarks.fake_embedding_server --port 8100 --latency 0.2 --rpm-limit 600
+    OPENAI_API_BASE=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake python make_chroma.py
+
+Vectors are deterministic pseudo-random unit vectors derived from the input, so the
+same text always gets the same embedding. The server can add latency, fail a
+fraction of requests with HTTP 500 and answer HTTP 429 above a requests-per-minute limit.
+"""
+
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from array import array
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_embedding(item, dim):
+    seed = int.from_bytes(hashlib.sha256(json.dumps(item).encode("utf-8")).digest()[:8], "little")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = sum(value * value for value in vector) ** 0.5
+    return [value / norm for value in vector]
+
+
+class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+    config = None
+    request_times = deque()
+    lock = threading.Lock()
+    stats = {"requests": 0, "inputs": 0, "rate_limited": 0, "failed": 0}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _rate_limited(self):
+        if not self.config.rpm_limit:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.request_times and now - self.request_times[0] > 60:
+                self.request_times.popleft()
+            if len(self.request_times) >= self.config.rpm_limit:
+                return True
+            self.request_times.append(now)
+            return False
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.stats)
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/embeddings"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        inputs = body["input"]
+        # 문자열 하나, 문자열 목록, 토큰 id 목록, 토큰 id 목록의 목록을 모두 허용
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+
+        with self.lock:
+            self.stats["requests"] += 1
+
+        if self._rate_limited():
+            with self.lock:
+                self.stats["rate_limited"] += 1
+            self._send_json(429, {"error": {"message": "rate limited", "type": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+            return
+
+        if self.config.latency:
+            time.sleep(self.config.latency)
+
+        if random.random() < self.config.failure_rate:
+            with self.lock:
+                self.stats["failed"] += 1
+            self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+
+        data = []
+        for index, item in enumerate(inputs):
+            vector = fake_embedding(item, self.config.dim)
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+
+        tokens = sum(len(item) if isinstance(item, list) else len(item.split()) for item in inputs)
+        with self.lock:
+            self.stats["inputs"] += len(inputs)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": body.get("model"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every successful request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--rpm-limit", type=int, default=0, help="requests per minute before HTTP 429 (0 disables)")
+    args = parser.parse_args()
+
+    FakeEmbeddingHandler.config = args
+    server = ThreadingHTTPServer((args.host, args.port), FakeEmbeddingHandler)
+    print(f"Fake embedding server listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare the per-venue index layout with the unified (single collection) layout.
+
+Build both layouts first (`python make_chroma.py` and `python make_chroma.py --unified`),
+then run from the repository root:
+
+    python -m benchmarks.index_layout --queries 200
+
+Query vectors are sampled from the stored embeddings, so no embedding API is called.
+Each layout runs in its own process so that resident memory and open file counts
+are not shared between them.
+"""
+
+import os
+import time
+import random
+import resource
+import argparse
+import statistics
+import multiprocessing
+
+import chromadb
+
+from chroma_store import list_venues, collection_name_for, venue_filter
+from constants import CHROMA_DB_DIR, UNIFIED_COLLECTION_NAME
+
+
+def sample_query_vectors(client, n):
+    collection = client.get_collection(UNIFIED_COLLECTION_NAME)
+    total = collection.count()
+    offsets = random.sample(range(total), min(n, total))
+    return [
+        collection.get(limit=1, offset=offset, include=["embeddings"])["embeddings"][0]
+        for offset in offsets
+    ]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_layout(layout, persist_directory, query_vectors, scenarios, k):
+    client = chromadb.PersistentClient(path=persist_directory)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if layout == "unified":
+        unified = client.get_collection(UNIFIED_COLLECTION_NAME)
+    else:
+        collections = {venue: client.get_collection(collection_name_for(*venue)) for venue in list_venues(client)}
+
+    report = {}
+    for scenario_name, venues in scenarios.items():
+        latencies = []
+        for query_vector in query_vectors:
+            start = time.perf_counter()
+            if layout == "unified":
+                conferences = sorted({conference for conference, _ in venues})
+                years = sorted({year for _, year in venues})
+                unified.query(query_embeddings=[query_vector], n_results=k, where=venue_filter(conferences, years))
+            else:
+                for venue in venues:
+                    if venue in collections:
+                        collections[venue].query(query_embeddings=[query_vector], n_results=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+        report[scenario_name] = (statistics.mean(latencies), percentile(latencies, 0.5), percentile(latencies, 0.99))
+
+    # ru_maxrss는 Linux에서 KB 단위
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    open_files = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else -1
+    return report, (rss_after - rss_before) / 1024, rss_after / 1024, open_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--persist-directory", default=CHROMA_DB_DIR)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    client = chromadb.PersistentClient(path=args.persist_directory)
+    venues = list_venues(client)
+    if not venues:
+        raise SystemExit(f"No per-venue collections in {args.persist_directory}; run make_chroma.py first.")
+    query_vectors = sample_query_vectors(client, args.queries)
+    del client
+
+    # 단일 venue 시나리오는 실제로 인덱싱된 가장 최근 venue를 사용
+    single_venue = max(venues, key=lambda venue: venue[1])
+    scenarios = {
+        f"single venue ({single_venue[0]} {single_venue[1]})": [single_venue],
+        "ICML+NeurIPS+ICLR 2018-2024": [venue for venue in venues if venue[0] in ("ICML", "NeurIPS", "ICLR")],
+        "all venues": venues,
+    }
+
+    # 레이아웃마다 별도의 프로세스에서 실행하여 메모리 사용량을 분리
+    context = multiprocessing.get_context("spawn")
+    for layout in ("per_venue", "unified"):
+        with context.Pool(1) as pool:
+            report, rss_delta_mb, rss_mb, open_files = pool.apply(
+                run_layout, (layout, args.persist_directory, query_vectors, scenarios, args.k)
+            )
+        print(f"== {layout}: peak RSS {rss_mb:.1f} MB (+{rss_delta_mb:.1f} MB for the index), {open_files} open files")
+        for scenario_name, (mean, p50, p99) in report.items():
+            print(f"   {scenario_name:<32} mean {mean:8.2f} ms   p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Measure the per-venue latency of the BM25 index used by mode=lexical and mode=hybrid.
+
+Build the index first (`python make_bm25.py`), then run from the repository root:
+
+    python -m benchmarks.lexical_search --repeat 200
+
+No embedding API is called.
+"""
+
+import time
+import argparse
+import statistics
+
+from bm25_index import LexicalIndex
+from constants import BM25_INDEX_DIR
+
+QUERIES = (
+    "LoRA",
+    "NeRF",
+    "diffusion models for image synthesis",
+    "low-rank adaptation of large language models",
+    "contrastive self-supervised representation learning for speech",
+)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index-dir", default=BM25_INDEX_DIR)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = LexicalIndex(args.index_dir)
+    print(f"Loaded {len(index.venues)} venues and {len(index.vocabulary)} terms in {time.perf_counter() - start:.2f} s")
+
+    for query in QUERIES:
+        latencies = []
+        for _ in range(args.repeat):
+            for venue in index.venues:
+                start = time.perf_counter()
+                index.search([venue], query, args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{query[:45]:<45} per venue: mean {statistics.mean(latencies):6.3f} ms   "
+            f"p50 {percentile(latencies, 0.5):6.3f} ms   p99 {percentile(latencies, 0.99):6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Load-test the search API and report throughput (RPS) and latency percentiles.
+
+Start the fake embedding server and the API against it, then run from the repository root:
+
+    python -m benchmarks.fake_embedding_server --port 8100 --latency 0.2
+    OPENAI_API_BASE=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake EMBEDDING_CACHE_PATH= \\
+        uvicorn app:app --port 7860
+    python -m benchmarks.load_test --requests 1000 --concurrency 128
+
+Every request carries a distinct query (unless --distinct is smaller than --requests),
+so each one pays the stubbed embedding latency. To compare before and after a change,
+run the same command against a server started from each revision. Requests rejected
+by the in-flight limit (HTTP 503) are counted separately; any other non-2xx response
+or connection error makes the run exit with status 1 and print the first error body.
+
+Without --conference/--year the newest venue indexed in the local Chroma directory
+(--persist-directory) is searched, so the run measures real searches rather than 404s.
+"""
+
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+from collections import Counter
+
+import httpx
+import chromadb
+
+from chroma_store import list_venues
+from constants import CHROMA_DB_DIR
+
+
+def default_venue(persist_directory, conference=None, year=None):
+    # 인덱싱된 venue 중 가장 최근 연도 (conference나 year가 주어지면 그에 맞는 venue 중에서)
+    venues = [venue for venue in list_venues(chromadb.PersistentClient(path=persist_directory))
+              if (conference is None or venue[0] == conference) and (year is None or venue[1] == year)]
+    if not venues:
+        raise SystemExit(f"No indexed venue matching {conference or '*'} {year or '*'} in {persist_directory}; "
+                         "run make_chroma.py or pass --conference and --year.")
+    return max(venues, key=lambda venue: venue[1])
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(args):
+    run_id = uuid.uuid4().hex[:8]
+    queries = [f"load test {run_id} query {index} about generative models" for index in range(args.distinct)]
+    latencies = []
+    statuses = Counter()
+    errors = {}  # 실패한 status(또는 예외 이름)별 첫 응답 본문
+    next_request = iter(range(args.requests))
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        async def worker():
+            for index in next_request:
+                params = {
+                    "query": queries[index % len(queries)],
+                    "conference": args.conference,
+                    "year": args.year,
+                    "recall_top_k": args.k,
+                    "fields": "title",
+                }
+                start = time.perf_counter()
+                try:
+                    response = await client.post(args.path, params=params)
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    errors.setdefault(type(e).__name__, str(e))
+                    continue
+                if response.is_success:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                elif response.status_code != 503:
+                    errors.setdefault(response.status_code, response.text[:500])
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.requests} requests to {args.conference} {args.year}, concurrency {args.concurrency}, {elapsed:.2f} s")
+    print(f"   statuses: {dict(statuses)}")
+    if latencies:
+        print(f"   throughput: {len(latencies) / elapsed:.1f} successful requests/s")
+        print(
+            f"   latency mean {statistics.mean(latencies):8.2f} ms   p50 {percentile(latencies, 0.5):8.2f} ms   "
+            f"p99 {percentile(latencies, 0.99):8.2f} ms"
+        )
+    if errors:
+        for status, body in errors.items():
+            print(f"   first {status} response: {body}")
+        raise SystemExit(f"{sum(statuses[status] for status in errors)} requests failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:7860")
+    parser.add_argument("--path", default="/search-papers")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--distinct", type=int, default=None, help="Number of distinct queries (default: one per request)")
+    parser.add_argument("--conference", help="default: the conference of the newest indexed venue (of --year)")
+    parser.add_argument("--year", type=int, help="default: the newest indexed year (of --conference)")
+    parser.add_argument("--persist-directory", default=CHROMA_DB_DIR, help="Chroma directory used to pick the default venue")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    args.distinct = args.distinct or args.requests
+    if args.conference is None or args.year is None:
+        args.conference, args.year = default_venue(args.persist_directory, args.conference, args.year)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measure the per-request cost of the API's logging before and after the queue-based setup.
+
+Run from the repository root:
+
+    python -m benchmarks.logging_overhead --requests 20000
+
+Each simulated request emits what a /search-papers request logs: the app's own
+lines plus the DEBUG/INFO lines of openai, httpcore and httpx made during the
+embedding call. "before" is the old root config (``basicConfig(level=DEBUG)``
+with f-strings and a synchronous stream handler), "after" is
+``log_config.configure_logging()`` with lazy ``%`` formatting. Output goes to a
+temporary file so that terminal speed does not distort the result.
+"""
+
+import time
+import atexit
+import logging
+import argparse
+import tempfile
+
+from log_config import configure_logging
+
+OPENAI_OPTIONS = {
+    "method": "post",
+    "url": "/embeddings",
+    "files": None,
+    "json_data": {"input": [[1734, 4211, 2955, 11, 5423, 304, 2217]], "model": "text-embedding-3-small", "encoding_format": "base64"},
+}
+HTTPCORE_EVENTS = (
+    "send_request_headers.started", "send_request_headers.complete", "send_request_body.started",
+    "send_request_body.complete", "receive_response_headers.started", "receive_response_headers.complete",
+    "receive_response_body.started", "receive_response_body.complete",
+)
+
+
+def library_logs():
+    # 임베딩 API 호출 중 openai, httpcore, httpx가 남기는 로그
+    logging.getLogger("openai._base_client").debug("Request options: %s", OPENAI_OPTIONS)
+    for event in HTTPCORE_EVENTS:
+        logging.getLogger("httpcore.http11").debug("%s request=<Request [b'POST']>", event)
+    logging.getLogger("httpx").info('HTTP Request: POST https://api.openai.com/v1/embeddings "HTTP/1.1 200 OK"')
+
+
+def request_before(index):
+    library_logs()
+    tokens_used, cached, total_cost = 168, False, 168 * 0.02 / 1_000_000
+    logging.info(f"Tokens used for query: {tokens_used} (cached: {cached})")
+    logging.info(f"Cost for embedding the query: ${total_cost:.6f}")
+
+
+def request_after(index):
+    library_logs()
+    logger = logging.getLogger("app")
+    tokens_used, cached, total_cost = 168, False, 168 * 0.02 / 1_000_000
+    logger.debug("Query embedding: %d tokens, cached %s, cost $%.6f", tokens_used, cached, total_cost)
+    logger.info("%s %s %d %.1fms", "POST", "/search-papers", 200, 12.3, extra={"request_id": f"{index:032x}"})
+
+
+def run(request_fn, requests):
+    start = time.perf_counter()
+    for index in range(requests):
+        request_fn(index)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def reset_logging():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for name in list(logging.root.manager.loggerDict):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile("w") as before_file, tempfile.TemporaryFile("w") as after_file:
+        reset_logging()
+        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s', stream=before_file)
+        before = run(request_before, args.requests)
+        before_bytes = before_file.tell()
+
+        reset_logging()
+        listener = configure_logging(stream=after_file)
+        after = run(request_after, args.requests)
+        drain_start = time.perf_counter()
+        atexit.unregister(listener.stop)
+        listener.stop()
+        drain = (time.perf_counter() - drain_start) / args.requests * 1e6
+        after_bytes = after_file.tell()
+
+    print(f"before: {before:8.2f} us/request on the request path, {before_bytes / args.requests:7.0f} bytes/request")
+    print(
+        f"after:  {after:8.2f} us/request on the request path, {after_bytes / args.requests:7.0f} bytes/request "
+        f"(+{drain:.2f} us/request left for the writer thread at the end)"
+    )
+    print(f"removed from the request path: {before - after:.2f} us/request ({1 - after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare the Chroma (HNSW) search path with the exact numpy engine.
+
+Export the collections first (`python export_numpy.py`), then run from the repository root:
+
+    python -m benchmarks.search_engine --queries 200
+
+Query vectors are sampled from the exported matrices, so no embedding API is called.
+Besides latency, the recall@k of Chroma against the exact numpy results is reported.
+"""
+
+import json
+import time
+import random
+import argparse
+import statistics
+
+import numpy as np
+
+from chroma_store import collection_name_for, create_client, list_venues, search_by_vector
+from numpy_index import NumpyIndex
+from constants import CHROMA_DB_DIR, NUMPY_INDEX_DIR
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--persist-directory", default=CHROMA_DB_DIR)
+    parser.add_argument("--index-dir", default=NUMPY_INDEX_DIR)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with open(f"{args.index_dir}/manifest.json", 'r', encoding='utf-8') as f:
+        embedding_model = json.load(f)["embedding_model"]
+    index = NumpyIndex(embedding_model, args.index_dir)
+    if not index.venues:
+        raise SystemExit(f"No exported venues in {args.index_dir}; run export_numpy.py first.")
+    client = create_client(args.persist_directory)
+    existing = {collection_name_for(*venue) for venue in list_venues(client)}
+    stores = {
+        venue: client.get_collection(collection_name_for(*venue))
+        for venue in index.venues if collection_name_for(*venue) in existing
+    }
+
+    query_vectors = []
+    for _ in range(args.queries):
+        venue = random.choice(index.venues)
+        matrix = index.matrices[venue]
+        query_vectors.append(np.array(matrix[random.randrange(len(matrix))]).tolist())
+
+    # 단일 venue 시나리오는 실제로 내보낸 가장 최근 venue를 사용
+    single_venue = max(index.venues, key=lambda venue: venue[1])
+    scenarios = {
+        f"single venue ({single_venue[0]} {single_venue[1]})": [single_venue],
+        "ICML+NeurIPS+ICLR": [venue for venue in index.venues if venue[0] in ("ICML", "NeurIPS", "ICLR")],
+        "all venues": index.venues,
+    }
+
+    for scenario_name, venues in scenarios.items():
+        venues = [venue for venue in venues if venue in stores]
+        if not venues:
+            continue
+        chroma_latencies, numpy_latencies, recalls = [], [], []
+        for query_vector in query_vectors:
+            start = time.perf_counter()
+            candidates = []
+            for venue in venues:
+                for result, score in search_by_vector(stores[venue], query_vector, k=args.k, with_abstract=False):
+                    candidates.append((score, result.metadata.get("paper_id") or result.metadata["title"]))
+            chroma_top = {key for _, key in sorted(candidates, reverse=True)[:args.k]}
+            chroma_latencies.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            exact = index.search(venues, query_vector, args.k)
+            numpy_latencies.append((time.perf_counter() - start) * 1000)
+
+            exact_top = {result.metadata.get("paper_id") or result.metadata["title"] for _, _, _, result in exact}
+            recalls.append(len(chroma_top & exact_top) / max(len(exact_top), 1))
+
+        print(f"== {scenario_name} ({len(venues)} collections)")
+        for name, latencies in (("chroma", chroma_latencies), ("numpy", numpy_latencies)):
+            print(
+                f"   {name:<7} mean {statistics.mean(latencies):8.2f} ms   "
+                f"p50 {percentile(latencies, 0.5):8.2f} ms   p99 {percentile(latencies, 0.99):8.2f} ms"
+            )
+        print(f"   chroma recall@{args.k} vs exact: {statistics.mean(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
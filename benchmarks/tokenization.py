@@ -0,0 +1,62 @@
+"""
+Token counting throughput on the full data/ corpus, before and after caching the encoder.
+
+    python -m benchmarks.tokenization
+
+"before" rebuilds the encoder with ``tiktoken.encoding_for_model`` for every document,
+as make_chroma.py used to do; "after" uses the shared encoder from tokenization.py
+with ``encode_ordinary_batch`` over 120-document batches.
+"""
+
+import glob
+import time
+import argparse
+
+import tiktoken
+
+from constants import OPENAI_EMBEDDING_MODEL_NAME
+from make_chroma import json2documents
+from tokenization import count_tokens_batch, get_encoder
+
+
+def count_before(texts):
+    total = 0
+    for text in texts:
+        tokenizer = tiktoken.encoding_for_model(OPENAI_EMBEDDING_MODEL_NAME)
+        total += len(tokenizer.encode(text))
+    return total
+
+
+def count_after(texts, batch_size, num_threads):
+    total = 0
+    for start in range(0, len(texts), batch_size):
+        total += sum(count_tokens_batch(texts[start:start + batch_size], num_threads=num_threads))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=120)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    texts = [doc.page_content for input_json in sorted(glob.glob('./data/*.json')) for doc in json2documents(input_json)]
+    # 인코더 로딩 시간은 두 경우 모두 측정에서 제외
+    get_encoder()
+
+    start = time.perf_counter()
+    tokens_before = count_before(texts)
+    elapsed_before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tokens_after = count_after(texts, args.batch_size, args.threads)
+    elapsed_after = time.perf_counter() - start
+
+    print(f"{len(texts)} documents")
+    print(f"before: {len(texts) / elapsed_before:10.0f} docs/s  ({elapsed_before:.2f} s, {tokens_before} tokens)")
+    print(f"after:  {len(texts) / elapsed_after:10.0f} docs/s  ({elapsed_after:.2f} s, {tokens_after} tokens)")
+    print(f"speedup: {elapsed_before / elapsed_after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
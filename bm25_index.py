@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import math
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from langchain.schema.document import Document
+
+from chroma_store import collection_name_for, make_paper_id, parse_collection_name
+from constants import BM25_INDEX_DIR
+
+# BM25 파라미터 (일반적으로 쓰이는 기본값)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# reciprocal-rank fusion의 순위 상수
+RRF_K = 60
+
+# 색인과 검색에서 무시하는 흔한 영어 단어
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have in into is it its of on or our than that the their these "
+    "this to via we which while with".split()
+)
+# 응답에 필요한 metadata만 저장
+STORED_FIELDS = ("paper_id", "title", "authors", "abstract", "conference", "year")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    # 소문자로 바꾼 영숫자 토큰 ("LoRA" -> "lora", "NeRF" -> "nerf")
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class VenuePostings:
+    """
+    Array-backed inverted index of one venue.
+
+    ``term_ids`` is the sorted array of the (global) term ids present in the venue;
+    the postings of ``term_ids[i]`` are ``doc_ids[offsets[i]:offsets[i + 1]]`` with
+    term frequencies in ``tfs``. Documents are numbered in input order.
+    """
+
+    def __init__(self, term_ids, offsets, doc_ids, tfs, doc_lengths):
+        self.term_ids = term_ids
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        average_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 1.0
+        # 문서 길이 정규화 항을 미리 계산
+        self.length_norms = array(
+            "f", (BM25_K1 * (1 - BM25_B + BM25_B * length / max(average_length, 1e-9)) for length in doc_lengths)
+        )
+
+    @classmethod
+    def build(cls, texts, vocabulary):
+        """Index ``texts``; unseen terms are appended to ``vocabulary`` (term -> global term id)."""
+        term_postings = {}  # term id -> (doc ids, term frequencies)
+        doc_lengths = array("I")
+        for doc_index, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                doc_ids, tfs = term_postings.setdefault(term_id, (array("I"), array("H")))
+                doc_ids.append(doc_index)
+                tfs.append(min(tf, 0xFFFF))
+
+        term_ids = array("I", sorted(term_postings))
+        offsets, doc_ids, tfs = array("I", [0]), array("I"), array("H")
+        for term_id in term_ids:
+            term_doc_ids, term_tfs = term_postings[term_id]
+            doc_ids.extend(term_doc_ids)
+            tfs.extend(term_tfs)
+            offsets.append(len(doc_ids))
+        return cls(term_ids, offsets, doc_ids, tfs, doc_lengths)
+
+    def header(self):
+        return {"documents": len(self.doc_lengths), "terms": len(self.term_ids), "postings": len(self.doc_ids)}
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            for values in (self.term_ids, self.offsets, self.doc_ids, self.tfs, self.doc_lengths):
+                values.tofile(f)
+
+    @classmethod
+    def load(cls, path, header):
+        arrays = []
+        with open(path, 'rb') as f:
+            for typecode, count in (
+                ("I", header["terms"]), ("I", header["terms"] + 1), ("I", header["postings"]),
+                ("H", header["postings"]), ("I", header["documents"]),
+            ):
+                values = array(typecode)
+                values.fromfile(f, count)
+                arrays.append(values)
+        return cls(*arrays)
+
+    def search(self, term_ids, k):
+        """Return the top ``k`` ``(doc_index, bm25_score)`` pairs for the query ``term_ids``."""
+        num_docs = len(self.doc_lengths)
+        scores = {}
+        for term_id in set(term_ids):
+            position = bisect_left(self.term_ids, term_id)
+            if position == len(self.term_ids) or self.term_ids[position] != term_id:
+                continue
+            start, end = self.offsets[position], self.offsets[position + 1]
+            idf = math.log(1 + (num_docs - (end - start) + 0.5) / (end - start + 0.5))
+            length_norms = self.length_norms
+            for doc_index, tf in zip(self.doc_ids[start:end], self.tfs[start:end]):
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + length_norms[doc_index])
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class LexicalIndex:
+    """
+    BM25 search over the per-venue postings written by ``make_bm25.py``.
+
+    The vocabulary is shared by all venues and every venue's postings are loaded
+    up front; the paper metadata is loaded lazily per venue. No embedding is
+    involved, so lexical searches are free.
+    """
+
+    def __init__(self, index_dir=BM25_INDEX_DIR):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(os.path.join(index_dir, "vocabulary.json"), 'r', encoding='utf-8') as f:
+            self.vocabulary = {term: term_id for term_id, term in enumerate(json.load(f))}
+
+        self.postings = {}
+        for collection_name, header in manifest["collections"].items():
+            venue = parse_collection_name(collection_name)
+            if venue is not None:
+                self.postings[venue] = VenuePostings.load(os.path.join(index_dir, f"{collection_name}.bm25"), header)
+
+        self._metadata = {}
+        self._lock = threading.Lock()
+
+    @property
+    def venues(self):
+        return sorted(self.postings)
+
+    def metadata(self, venue):
+        with self._lock:
+            if venue not in self._metadata:
+                path = os.path.join(self.index_dir, f"{collection_name_for(*venue)}.json")
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._metadata[venue] = json.load(f)["metadatas"]
+            return self._metadata[venue]
+
+    def search(self, venues, query, k):
+        """Return the global top ``k`` of ``venues`` for ``query`` as ``(score, conference, year, Document)`` tuples."""
+        term_ids = [self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary]
+        candidates = []
+        for venue in venues:
+            if venue in self.postings:
+                for doc_index, score in self.postings[venue].search(term_ids, k):
+                    candidates.append((score, venue, doc_index))
+
+        return [
+            (score, conference, year, Document(page_content="", metadata=self.metadata((conference, year))[doc_index]))
+            for score, (conference, year), doc_index in heapq.nlargest(k, candidates, key=lambda candidate: candidate[0])
+        ]
+
+
+def reciprocal_rank_fusion(rankings, k, rrf_k=RRF_K):
+    """
+    Fuse several ranked lists of ``(score, conference, year, Document)`` tuples into one top ``k``.
+
+    A paper scores ``sum(1 / (rrf_k + rank))`` over the lists it appears in; papers
+    are matched by venue, title and authors (the fields of ``make_paper_id``), which
+    every list has even when it comes from a collection built without ``paper_id``.
+    The fused score replaces the original one.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (_, conference, year, document) in enumerate(ranking, start=1):
+            # 저장된 paper_id는 collection에 따라 없거나 이전 규칙일 수 있으므로 양쪽 모두 metadata에서 다시 계산
+            metadata = document.metadata
+            key = make_paper_id(conference, year, metadata.get("title") or "", metadata.get("authors") or "")
+            score, candidate = fused.get(key, (0.0, (conference, year, document)))
+            fused[key] = (score + 1 / (rrf_k + rank), candidate)
+
+    top = heapq.nlargest(k, fused.values(), key=lambda entry: entry[0])
+    return [(score, conference, year, document) for score, (conference, year, document) in top]
@@ -0,0 +1,286 @@
+import os
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+
+import chromadb
+from langchain.schema.document import Document
+
+from constants import CHROMA_DB_DIR, COLLECTION_CACHE_SIZE, OPENAI_EMBEDDING_MODEL_NAME
+
+# Collection metadata key recording the model that produced the stored vectors
+EMBEDDING_MODEL_KEY = "embedding_model"
+# Collections built before the model was recorded were all embedded with OpenAI
+LEGACY_EMBEDDING_MODEL = f"openai/{OPENAI_EMBEDDING_MODEL_NAME}"
+
+
+class EmbeddingModelMismatch(ValueError):
+    """Raised when a collection was embedded with a different model than the one used for queries."""
+
+
+class CollectionNotFound(LookupError):
+    """Raised when a search asks for a venue that is not indexed."""
+
+
+def collection_embedding_model(collection):
+    return (collection.metadata or {}).get(EMBEDDING_MODEL_KEY, LEGACY_EMBEDDING_MODEL)
+
+
+def check_embedding_model(collection, embedding_model):
+    stored_model = collection_embedding_model(collection)
+    if stored_model != embedding_model:
+        raise EmbeddingModelMismatch(
+            f"Collection '{collection.name}' was embedded with '{stored_model}', "
+            f"but the current embedding model is '{embedding_model}'."
+        )
+
+
+def collection_metadata(embedding_model):
+    return {"hnsw:space": "cosine", EMBEDDING_MODEL_KEY: embedding_model}
+
+
+def collection_name_for(conference, year):
+    # make_chroma.py와 동일한 collection 이름 규칙
+    return f"{conference}_{year}_collection"
+
+
+def make_paper_id(conference, year, title, authors):
+    """
+    Stable id of a paper: ``{conference}_{year}_{hash of the title and authors}``.
+
+    The id depends on the venue, the title and the author list (case and whitespace
+    ignored), so it survives re-crawled abstracts, two papers of a venue with the
+    same title get different ids, and the venue can be read back from the id.
+    """
+    normalized = "\0".join(" ".join(text.lower().split()) for text in (title, authors))
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+    return f"{conference}_{year}_{digest}"
+
+
+def parse_paper_id(paper_id):
+    """Return the ``(conference, year)`` encoded in a ``make_paper_id`` id; None if it does not match."""
+    parts = paper_id.rsplit("_", 2)
+    if len(parts) != 3 or not parts[1].isdigit() or len(parts[2]) != 12:
+        return None
+    return parts[0], int(parts[1])
+
+
+def parse_collection_name(collection_name):
+    """Split ``{conference}_{year}_collection`` into ``(conference, year)``; None if it does not match."""
+    parts = collection_name.split("_")
+    if len(parts) != 3 or parts[2] != "collection" or not parts[1].isdigit():
+        return None
+    return parts[0], int(parts[1])
+
+
+def list_venues(client):
+    """Return the ``(conference, year)`` pairs of every per-venue collection stored in ``client``."""
+    venues = []
+    for collection in client.list_collections():
+        # chromadb 0.5는 Collection 객체를, 0.6 이후는 이름을 반환
+        name = getattr(collection, "name", collection)
+        venue = parse_collection_name(name)
+        if venue is not None:
+            venues.append(venue)
+    return sorted(venues)
+
+
+def create_client(persist_directory=CHROMA_DB_DIR):
+    """Create the process-wide persistent Chroma client."""
+    return chromadb.PersistentClient(path=persist_directory)
+
+
+class CollectionCache:
+    """
+    Bounded LRU of per-venue Chroma collections sharing one client.
+
+    Entries are keyed by collection name. Each entry remembers the id of the
+    underlying collection; when the Chroma SQLite file changes on disk the id is
+    re-resolved and stale entries (deleted or recreated collections) are dropped.
+    Collections are only opened, never created: a missing one raises
+    ``CollectionNotFound``, and one embedded with another model than
+    ``embedding_model`` raises ``EmbeddingModelMismatch``.
+    """
+
+    def __init__(self, client, embedding_model, maxsize=COLLECTION_CACHE_SIZE, persist_directory=CHROMA_DB_DIR):
+        self.client = client
+        self.embedding_model = embedding_model
+        self.maxsize = maxsize
+        self.sqlite_path = os.path.join(persist_directory, "chroma.sqlite3")
+
+        self._entries = OrderedDict()  # collection_name -> (collection, collection_id)
+        self._lock = threading.Lock()
+        self._disk_mtime = self._current_mtime()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.sqlite_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _open(self, collection_name):
+        # get_or_create를 쓰면 없는 학회/연도 요청마다 빈 collection이 디스크에 생기므로 get_collection만 사용
+        try:
+            collection = self.client.get_collection(collection_name)
+        except Exception:
+            raise CollectionNotFound(f"No collection named '{collection_name}'.") from None
+        check_embedding_model(collection, self.embedding_model)
+        return collection, collection.id
+
+    def _revalidate(self):
+        # 디스크의 SQLite 파일이 바뀌었을 때만 collection id를 다시 확인
+        mtime = self._current_mtime()
+        if mtime == self._disk_mtime:
+            return
+        self._disk_mtime = mtime
+
+        for collection_name, (_, collection_id) in list(self._entries.items()):
+            try:
+                current_id = self.client.get_collection(collection_name).id
+            except Exception:
+                current_id = None
+            if current_id != collection_id:
+                del self._entries[collection_name]
+                self.invalidations += 1
+
+    def get(self, conference, year):
+        """Return the cached collection of ``conference``/``year``, opening it on a miss."""
+        return self.get_by_name(collection_name_for(conference, year))
+
+    def get_by_name(self, collection_name):
+        """Return the cached collection ``collection_name``, opening it on a miss."""
+        with self._lock:
+            self._revalidate()
+
+            entry = self._entries.get(collection_name)
+            if entry is not None:
+                self._entries.move_to_end(collection_name)
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            entry = self._open(collection_name)
+            self._entries[collection_name] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return entry[0]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def venue_filter(conferences, years):
+    """
+    Build the metadata ``where`` clause selecting ``conferences`` and ``years`` in the unified collection.
+
+    make_chroma.py stores the year as a string, so the years are compared as strings.
+    """
+    conferences = list(conferences)
+    years = [str(year) for year in years]
+    conference_clause = {"conference": conferences[0]} if len(conferences) == 1 else {"conference": {"$in": conferences}}
+    year_clause = {"year": years[0]} if len(years) == 1 else {"year": {"$in": years}}
+    return {"$and": [conference_clause, year_clause]}
+
+
+def venue_indexed(collection, conference, year):
+    """Return whether the unified ``collection`` holds any paper of ``conference``/``year``."""
+    found = collection.get(where=venue_filter([conference], [year]), limit=1, include=[])
+    return bool(found["ids"])
+
+
+def legacy_abstract(page_content):
+    # abstract metadata가 없는 예전 collection은 page_content에서 abstract를 추출
+    _, _, abstract = page_content.partition("\nAbstract: ")
+    return abstract
+
+
+def relevance_score_fn(collection):
+    """Distance-to-relevance conversion of ``collection``'s space, as in langchain's ``Chroma``."""
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    if space == "cosine":
+        return lambda distance: 1.0 - distance
+    if space == "ip":
+        return lambda distance: 1.0 - distance if distance > 0 else -1.0 * distance
+    return lambda distance: 1.0 - distance / math.sqrt(2)
+
+
+def search_by_vectors(collection, embeddings, k, filter=None, with_abstract=True):
+    """
+    Search ``collection`` with several precomputed query embeddings in one Chroma query.
+
+    Returns one list of ``(Document, relevance_score)`` pairs per embedding, using the
+    same distance-to-relevance conversion as ``similarity_search_with_relevance_scores``.
+    Only metadata is fetched from Chroma; the document text is read back only for
+    collections built before the abstract was stored in metadata, and only when
+    ``with_abstract`` is set.
+    """
+    results = collection.query(
+        query_embeddings=list(embeddings),
+        n_results=k,
+        where=filter,
+        include=["metadatas", "distances"]
+    )
+    metadatas = [[dict(metadata) for metadata in query_metadatas] for query_metadatas in results["metadatas"]]
+
+    if with_abstract:
+        legacy_ids = sorted({
+            id_
+            for query_ids, query_metadatas in zip(results["ids"], metadatas)
+            for id_, metadata in zip(query_ids, query_metadatas)
+            if "abstract" not in metadata
+        })
+        if legacy_ids:
+            legacy = collection.get(ids=legacy_ids, include=["documents"])
+            abstracts = {id_: legacy_abstract(document) for id_, document in zip(legacy["ids"], legacy["documents"])}
+            for query_ids, query_metadatas in zip(results["ids"], metadatas):
+                for id_, metadata in zip(query_ids, query_metadatas):
+                    if id_ in abstracts:
+                        metadata["abstract"] = abstracts[id_]
+
+    to_relevance = relevance_score_fn(collection)
+    return [
+        [
+            (Document(page_content="", metadata=metadata), to_relevance(distance))
+            for metadata, distance in zip(query_metadatas, query_distances)
+        ]
+        for query_metadatas, query_distances in zip(metadatas, results["distances"])
+    ]
+
+
+def search_by_vector(collection, embedding, k, filter=None, with_abstract=True):
+    """Search ``collection`` with a single precomputed query embedding (see ``search_by_vectors``)."""
+    return search_by_vectors(collection, [embedding], k, filter=filter, with_abstract=with_abstract)[0]
+
+
+def stored_embedding(collection, paper_id):
+    """Return the stored embedding of the paper with metadata ``paper_id`` in ``collection``, or None."""
+    found = collection.get(where={"paper_id": paper_id}, limit=1, include=["embeddings"])
+    if not found["ids"]:
+        return None
+    return list(found["embeddings"][0])
+
+
+def warm_up(collection, k=10):
+    """
+    Query ``collection`` with one of its own embeddings so its HNSW index is paged into memory.
+
+    No embedding API is called. Returns the number of results (0 for an empty collection).
+    """
+    sample = collection.get(limit=1, include=["embeddings"])
+    if not sample["ids"]:
+        return 0
+    return len(search_by_vector(collection, list(sample["embeddings"][0]), k=k, with_abstract=False))
@@ -1,6 +1,69 @@
+import os
+
 # Name of the OpenAI model used for embedding text
 OPENAI_EMBEDDING_MODEL_NAME = "text-embedding-3-small"
 COST_PER_TOKEN = 0.020 / 1_000_000  # 1,000,000 토큰당 $0.020 (text-embedding-3-small 모델의 가격)
+# Longest input (in tokens) the OpenAI embedding model accepts in one piece
+OPENAI_EMBEDDING_CONTEXT_TOKENS = 8191
+
+# Embedding provider used for indexing and queries: "openai" or "local" (CPU sentence-transformers)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+LOCAL_EMBEDDING_MODEL_NAME = os.getenv("LOCAL_EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "64"))
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", "2"))
 
 # Directory for storing Chroma vector database files
-CHROMA_DB_DIR = "chroma_dir"
\ No newline at end of file
+CHROMA_DB_DIR = "chroma_dir"
+
+# Maximum number of Chroma collection handles kept open by the API (LRU)
+COLLECTION_CACHE_SIZE = int(os.getenv("COLLECTION_CACHE_SIZE", "32"))
+# Collections opened and queried once at server startup: "all", a list such as "NeurIPS_2024,ICML_2024", or empty
+PRELOAD_COLLECTIONS = [name.strip() for name in os.getenv("PRELOAD_COLLECTIONS", "all").split(",") if name.strip()]
+
+# Number of query embeddings kept in memory (LRU)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+# SQLite file for the persistent embedding cache; empty disables the disk tier
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+
+# Seconds a /search-papers response is reused for identical requests, and the number of responses kept
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "30"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1000"))
+
+# Number of threads used to search several collections concurrently
+SEARCH_FANOUT_WORKERS = int(os.getenv("SEARCH_FANOUT_WORKERS", "8"))
+# Number of threads running CPU-bound request work (token counting, index search) off the event loop
+SEARCH_EXECUTOR_WORKERS = int(os.getenv("SEARCH_EXECUTOR_WORKERS", str(os.cpu_count() or 4)))
+# Search requests handled at once; further requests get HTTP 503 with Retry-After (0 disables the limit)
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv("MAX_IN_FLIGHT_REQUESTS", "64"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "1"))
+
+# Single collection holding every venue when make_chroma.py is run with --unified
+UNIFIED_COLLECTION_NAME = "all_papers_collection"
+# Index layout searched by the API: "per_venue" ({conference}_{year}_collection) or "unified"
+INDEX_LAYOUT = os.getenv("INDEX_LAYOUT", "per_venue")
+
+# Embedding scheduler used by make_chroma.py
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+EMBEDDING_TOKENS_PER_MINUTE = int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "1000000"))
+EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "3000"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
+# Number of venue files make_chroma.py indexes concurrently
+INDEX_VENUE_WORKERS = int(os.getenv("INDEX_VENUE_WORKERS", "4"))
+
+# Search engine used by the API: "chroma" (HNSW) or "numpy" (exact search over export_numpy.py output)
+SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "chroma")
+# Directory written by export_numpy.py
+NUMPY_INDEX_DIR = os.getenv("NUMPY_INDEX_DIR", "numpy_index")
+
+# Logging of the API: root level, per-logger overrides ("name=LEVEL,...") and output format ("json" or "text")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "httpx=WARNING,httpcore=WARNING,openai=WARNING,chromadb=WARNING,urllib3=WARNING")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Directory written by make_bm25.py (BM25 index for mode=lexical and mode=hybrid)
+BM25_INDEX_DIR = os.getenv("BM25_INDEX_DIR", "bm25_index")
+# Results taken from each of the vector and BM25 searches before reciprocal-rank fusion in mode=hybrid
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "50"))
+
+# Maximum number of queries accepted by /search-papers/batch
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "500"))
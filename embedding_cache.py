@@ -0,0 +1,183 @@
+import os
+import re
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+from constants import OPENAI_EMBEDDING_MODEL_NAME, EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH
+
+
+def normalize_query(text):
+    # 앞뒤 공백 제거 및 연속된 공백을 하나로 통일
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of query embeddings keyed by (model name, normalized query).
+
+    The first tier is an in-memory LRU bounded by ``maxsize`` entries. The optional
+    second tier is a SQLite file storing float32 vectors, so embeddings survive
+    server restarts. ``aget_or_embed`` awaits the coroutine function ``aembed_fn`` only
+    on a full miss; ``aget_or_embed_many`` embeds all of its misses with a single
+    awaited ``aembed_many_fn`` call. SQLite reads and writes run in ``executor``
+    (the event loop's default executor if None), so they never block the event loop.
+    """
+
+    def __init__(
+        self,
+        aembed_fn,
+        aembed_many_fn=None,
+        model_name=OPENAI_EMBEDDING_MODEL_NAME,
+        maxsize=EMBEDDING_CACHE_SIZE,
+        path=EMBEDDING_CACHE_PATH,
+        executor=None,
+    ):
+        self.aembed_fn = aembed_fn
+        self.aembed_many_fn = aembed_many_fn
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self.path = path
+        self.executor = executor
+
+        self._memory = OrderedDict()  # key -> array('f')
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # 요청 경로에서 호출되므로 WAL 모드로 commit마다 fsync하지 않도록 설정
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT, vector BLOB)")
+            self._db.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, normalized):
+        return hashlib.sha256(f"{self.model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, vector):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = vector
+        self._memory_bytes += vector.itemsize * len(vector)
+        while len(self._memory) > self.maxsize:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.itemsize * len(evicted)
+
+    def _load(self, key):
+        row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector
+
+    def _store(self, key, vector):
+        self._db.execute(
+            "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+            (key, self.model_name, vector.tobytes())
+        )
+        self._db.commit()
+
+    def lookup(self, query):
+        """Return the cached embedding of ``query`` or None without calling the provider."""
+        key = self._key(normalize_query(query))
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector.tolist()
+
+            if self._db is not None:
+                vector = self._load(key)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector.tolist()
+
+            self.misses += 1
+            return None
+
+    def put(self, query, embedding):
+        key = self._key(normalize_query(query))
+        vector = array("f", embedding)
+        with self._lock:
+            self._remember(key, vector)
+            if self._db is not None:
+                self._store(key, vector)
+
+    async def _run(self, fn, *args):
+        # 디스크 tier가 없으면 메모리만 사용하므로 바로 실행
+        if self._db is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def aget_or_embed(self, query):
+        """Return ``(embedding, cached)``; ``cached`` is False when ``aembed_fn`` was awaited."""
+        embedding = await self._run(self.lookup, query)
+        if embedding is not None:
+            return embedding, True
+
+        embedding = await self.aembed_fn(normalize_query(query))
+        await self._run(self.put, query, embedding)
+        return embedding, False
+
+    def _lookup_many(self, queries):
+        # 캐시된 결과와, 임베딩이 필요한 정규화된 쿼리 -> 인덱스 목록을 반환
+        results = [None] * len(queries)
+        missing = {}
+        for index, query in enumerate(queries):
+            embedding = self.lookup(query)
+            if embedding is not None:
+                results[index] = (embedding, True)
+            else:
+                missing.setdefault(normalize_query(query), []).append(index)
+        return results, missing
+
+    def _fill_many(self, results, missing, embeddings):
+        for text, embedding in zip(missing, embeddings):
+            self.put(text, embedding)
+            indices = missing[text]
+            results[indices[0]] = (embedding, False)
+            for index in indices[1:]:
+                results[index] = (embedding, True)
+        return results
+
+    async def aget_or_embed_many(self, queries):
+        """
+        Return ``(embedding, cached)`` for every query, in input order.
+
+        Misses are de-duplicated and embedded in one awaited ``aembed_many_fn`` call; repeated
+        queries in the same batch are reported as cached after their first occurrence.
+        """
+        results, missing = await self._run(self._lookup_many, queries)
+        if missing:
+            embeddings = await self.aembed_many_fn(list(missing))
+            await self._run(self._fill_many, results, missing, embeddings)
+        return results
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            disk_bytes = os.path.getsize(self.path) if self._db is not None and os.path.exists(self.path) else 0
+            return {
+                "size": len(self._memory),
+                "maxsize": self.maxsize,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": disk_bytes,
+            }
@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.embeddings.base import Embeddings
+from langchain.embeddings.openai import OpenAIEmbeddings
+
+from constants import (
+    EMBEDDING_PROVIDER, OPENAI_EMBEDDING_MODEL_NAME, COST_PER_TOKEN,
+    LOCAL_EMBEDDING_MODEL_NAME, LOCAL_EMBEDDING_BATCH_SIZE, LOCAL_EMBEDDING_THREADS
+)
+
+EMBEDDING_PROVIDERS = ("openai", "local")
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    CPU-only sentence-transformers embeddings, so indexing and serving need no network.
+
+    Documents are encoded in batches of ``batch_size`` spread over a thread pool
+    (PyTorch releases the GIL during inference). Vectors are L2-normalized, which
+    matches the cosine space of the Chroma collections.
+    """
+
+    def __init__(self, model_name=LOCAL_EMBEDDING_MODEL_NAME, batch_size=LOCAL_EMBEDDING_BATCH_SIZE, num_threads=LOCAL_EMBEDDING_THREADS):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "The local embedding provider requires sentence-transformers: pip install sentence-transformers"
+            ) from e
+
+        # 스레드마다 torch가 모든 코어를 쓰지 않도록 intra-op 스레드 수를 나눔
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // num_threads))
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(max_workers=num_threads)
+
+    def _encode(self, texts):
+        return self.model.encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True
+        ).tolist()
+
+    def embed_documents(self, texts):
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        return [vector for vectors in self.executor.map(self._encode, batches) for vector in vectors]
+
+    def embed_query(self, text):
+        return self._encode([text])[0]
+
+
+def embedding_model_tag(provider=EMBEDDING_PROVIDER):
+    """Name stored on every collection to record which model produced its vectors."""
+    if provider == "openai":
+        return f"openai/{OPENAI_EMBEDDING_MODEL_NAME}"
+    if provider == "local":
+        return f"local/{LOCAL_EMBEDDING_MODEL_NAME}"
+    raise ValueError(f"Unknown embedding provider '{provider}'. Supported providers: {', '.join(EMBEDDING_PROVIDERS)}.")
+
+
+def embedding_cost_per_token(provider=EMBEDDING_PROVIDER):
+    # 로컬 모델은 비용이 들지 않음
+    return COST_PER_TOKEN if provider == "openai" else 0.0
+
+
+def create_embeddings(provider=EMBEDDING_PROVIDER, **openai_kwargs):
+    """Create the embedding function of ``provider`` (``openai`` or ``local``); ``openai_kwargs`` only apply to OpenAI."""
+    if provider == "openai":
+        return OpenAIEmbeddings(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            model=OPENAI_EMBEDDING_MODEL_NAME,
+            **openai_kwargs
+        )
+    if provider == "local":
+        return LocalEmbeddings()
+    raise ValueError(f"Unknown embedding provider '{provider}'. Supported providers: {', '.join(EMBEDDING_PROVIDERS)}.")
@@ -0,0 +1,122 @@
+import time
+import random
+import asyncio
+
+from constants import (
+    EMBEDDING_MAX_CONCURRENCY, EMBEDDING_TOKENS_PER_MINUTE, EMBEDDING_REQUESTS_PER_MINUTE, EMBEDDING_MAX_RETRIES
+)
+
+
+class RateLimiter:
+    """
+    Token bucket refilled continuously up to ``per_minute`` units per minute.
+
+    A budget of 0 (or None) disables the limiter.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.available = per_minute
+        self.rate = per_minute / 60 if per_minute else None
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount):
+        if not self.capacity:
+            return
+        # 버킷보다 큰 요청은 버킷 전체를 사용하도록 제한 (영원히 기다리지 않도록)
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+
+class Progress:
+    """
+    Documents, tokens and failed batches of one collection being indexed.
+
+    The totals can grow while batches are still being parsed and submitted.
+    """
+
+    def __init__(self, name, total_docs=0, total_tokens=0):
+        self.name = name
+        self.total_docs = total_docs
+        self.total_tokens = total_tokens
+        self.done_docs = 0
+        self.done_tokens = 0
+        self.failed_batches = []
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def report(self):
+        elapsed = max(self.elapsed, 1e-9)
+        print(
+            f"[{self.name}] {self.done_docs}/{self.total_docs} docs, {self.done_tokens}/{self.total_tokens} tokens "
+            f"({self.done_docs / elapsed:.1f} docs/s, {self.done_tokens / elapsed:.0f} tokens/s)"
+        )
+
+
+class EmbeddingScheduler:
+    """
+    Run embedding batches under a concurrency limit and token/request-per-minute budgets.
+
+    Each batch is retried with exponential backoff and full jitter; a batch that
+    still fails after ``max_retries`` retries is recorded in ``Progress.failed_batches``
+    instead of aborting the other batches.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=EMBEDDING_MAX_CONCURRENCY,
+        tokens_per_minute=EMBEDDING_TOKENS_PER_MINUTE,
+        requests_per_minute=EMBEDDING_REQUESTS_PER_MINUTE,
+        max_retries=EMBEDDING_MAX_RETRIES,
+        base_delay=1.0,
+        max_delay=60.0,
+    ):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.token_limiter = RateLimiter(tokens_per_minute)
+        self.request_limiter = RateLimiter(requests_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        # exponential backoff + full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def submit(self, batch_fn, progress, batch_index, num_docs, num_tokens):
+        """
+        Await ``batch_fn()`` once the budgets allow it, retrying on failure.
+
+        Returns True when the batch succeeded.
+        """
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.request_limiter.acquire(1)
+                await self.token_limiter.acquire(num_tokens)
+                try:
+                    await batch_fn()
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        print(f"[{progress.name}] batch {batch_index} failed after {attempt + 1} attempts: {e}")
+                        progress.failed_batches.append(batch_index)
+                        return False
+                    delay = self.backoff(attempt)
+                    print(f"[{progress.name}] batch {batch_index} failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+        progress.done_docs += num_docs
+        progress.done_tokens += num_tokens
+        progress.report()
+        return True
@@ -0,0 +1,45 @@
+import os
+import json
+import argparse
+
+from chroma_store import collection_embedding_model, collection_name_for, create_client, list_venues
+from numpy_index import export_collection
+from constants import CHROMA_DB_DIR, NUMPY_INDEX_DIR
+
+
+def main(args):
+    client = create_client(args.persist_directory)
+    venues = list_venues(client)
+    if not venues:
+        print(f"No {{conference}}_{{year}}_collection found in '{args.persist_directory}'.")
+        return
+
+    collection_names = []
+    embedding_models = set()
+    for venue in venues:
+        collection = client.get_collection(collection_name_for(*venue))
+        count = export_collection(collection, args.index_dir)
+        collection_names.append(collection.name)
+        embedding_models.add(collection_embedding_model(collection))
+        print(f"Exported {count} documents from '{collection.name}'.")
+
+    # 검색 엔진은 모든 collection이 같은 임베딩 모델을 사용한다고 가정
+    if len(embedding_models) > 1:
+        raise ValueError(f"Collections were embedded with different models: {sorted(embedding_models)}")
+
+    with open(os.path.join(args.index_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump({"embedding_model": embedding_models.pop(), "collections": collection_names}, f, indent=2)
+    print(f"Wrote {len(collection_names)} collections to '{args.index_dir}'.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Export every {conference}_{year}_collection to memory-mappable .npy matrices for SEARCH_ENGINE=numpy."
+    )
+    parser.add_argument("--persist-directory", default=CHROMA_DB_DIR)
+    parser.add_argument("--index-dir", default=NUMPY_INDEX_DIR)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,64 @@
+import json
+
+
+def _iter_json_array(f, chunk_size):
+    # 파일을 chunk 단위로 읽으면서 배열의 원소를 하나씩 decode
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 원소가 chunk 경계에서 잘린 경우 다음 chunk를 읽은 뒤 다시 시도
+                if eof:
+                    raise
+            else:
+                yield value
+                pos = end
+                continue
+
+        if eof:
+            if started:
+                raise ValueError("unterminated JSON array")
+            return
+
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def iter_json_entries(path, chunk_size=1 << 16):
+    """
+    Yield the entries of a crawled ``data/`` file one at a time.
+
+    ``.jsonl`` files are read line by line, skipping a last line without a newline
+    (a paper the crawler is still writing); ``.json`` files must hold a JSON array
+    (the format of ``scrapy crawl -O``) and are decoded incrementally, so memory
+    does not grow with the file size.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # 아직 쓰는 중이거나 중단된 크롤링이 남긴 마지막 줄의 일부
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f, chunk_size)
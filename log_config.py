@@ -0,0 +1,91 @@
+import sys
+import json
+import queue
+import atexit
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from constants import LOG_LEVEL, LOG_LEVELS, LOG_FORMAT
+
+# LogRecord의 기본 속성 (이 외의 속성은 extra로 전달된 필드로 간주)
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+
+    Fields passed through ``extra=`` (e.g. ``request_id``) are added next to the
+    timestamp, level, logger name and message.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    ``QueueHandler`` for a listener in the same process.
+
+    Only the ``%`` arguments are merged in the calling thread; formatting,
+    serialization and I/O all happen on the listener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_logger_levels(spec):
+    # "httpx=WARNING,chromadb=ERROR" -> {"httpx": "WARNING", "chromadb": "ERROR"}
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level=LOG_LEVEL, logger_levels=LOG_LEVELS, log_format=LOG_FORMAT, stream=None):
+    """
+    Route every log record through a queue to a single writer thread.
+
+    ``level`` applies to the root logger and ``logger_levels`` (``name=LEVEL,...``)
+    overrides it per logger. ``log_format`` is ``json`` or ``text``. Existing root
+    handlers are replaced. Returns the started ``QueueListener``, which is also
+    stopped (flushing pending records) at interpreter exit.
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for old_handler in list(root.handlers):
+        root.removeHandler(old_handler)
+        old_handler.close()
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level.upper())
+    for name, logger_level in parse_logger_levels(logger_levels).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import argparse
+
+from bm25_index import STORED_FIELDS, VenuePostings
+from chroma_store import collection_name_for
+from make_chroma import find_input_files, iter_documents, parse_source_file
+from constants import BM25_INDEX_DIR
+
+
+def load_existing(index_dir):
+    # 기존 vocabulary의 term id를 유지해야 다시 만들지 않은 venue의 postings가 계속 유효함
+    manifest = {"collections": {}}
+    vocabulary = {}
+    if os.path.exists(os.path.join(index_dir, "manifest.json")):
+        with open(os.path.join(index_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(os.path.join(index_dir, "vocabulary.json"), 'r', encoding='utf-8') as f:
+            vocabulary = {term: term_id for term_id, term in enumerate(json.load(f))}
+    return manifest, vocabulary
+
+
+def main(args):
+    input_files = find_input_files(args.data_dir, args.venues, args.years)
+    if not input_files:
+        print(f"No input files found in '{args.data_dir}'.")
+        return
+
+    os.makedirs(args.index_dir, exist_ok=True)
+    manifest, vocabulary = load_existing(args.index_dir)
+
+    for input_json in input_files:
+        start = time.monotonic()
+        _, conference, year = parse_source_file(input_json)
+        collection_name = collection_name_for(conference, year)
+
+        # make_chroma.py와 같은 방식으로 파일을 읽어 같은 paper_id와 필드를 사용
+        metadatas = [
+            {field: doc.metadata[field] for field in STORED_FIELDS}
+            for doc in iter_documents(input_json)
+        ]
+        postings = VenuePostings.build((f"{metadata['title']} {metadata['abstract']}" for metadata in metadatas), vocabulary)
+
+        postings.save(os.path.join(args.index_dir, f"{collection_name}.bm25"))
+        with open(os.path.join(args.index_dir, f"{collection_name}.json"), 'w', encoding='utf-8') as f:
+            json.dump({"metadatas": metadatas}, f, ensure_ascii=False)
+        manifest["collections"][collection_name] = postings.header()
+        print(
+            f"Indexed {len(metadatas)} documents of '{collection_name}' "
+            f"({postings.header()['postings']} postings, {time.monotonic() - start:.1f}s)."
+        )
+
+    terms = sorted(vocabulary, key=vocabulary.get)
+    with open(os.path.join(args.index_dir, "vocabulary.json"), 'w', encoding='utf-8') as f:
+        json.dump(terms, f, ensure_ascii=False)
+    with open(os.path.join(args.index_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Wrote {len(manifest['collections'])} venues and {len(terms)} terms to '{args.index_dir}'.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build the BM25 index used by mode=lexical and mode=hybrid from the crawled papers in ./data."
+    )
+    parser.add_argument("--data-dir", default="./data")
+    parser.add_argument("--index-dir", default=BM25_INDEX_DIR)
+    parser.add_argument("--venues", nargs="+", metavar="CONFERENCE",
+                        help="only index these conferences, e.g. --venues ICML NeurIPS (default: all)")
+    parser.add_argument("--years", nargs="+", metavar="YEAR",
+                        help="only index these years, e.g. --years 2023 2024 (default: all)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
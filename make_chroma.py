@@ -1,43 +1,67 @@
 import os
-import json
+import hashlib
 import glob
+import time
 import asyncio
-import tiktoken  # OpenAI 토큰화를 위한 라이브러리
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 from langchain.schema.document import Document
 from langchain_community.vectorstores import Chroma
-from langchain.embeddings.openai import OpenAIEmbeddings
 
-from constants import OPENAI_EMBEDDING_MODEL_NAME, COST_PER_TOKEN
+from chroma_store import (
+    EmbeddingModelMismatch, check_embedding_model, collection_metadata, create_client, make_paper_id, venue_filter
+)
+from embedding_providers import (
+    EMBEDDING_PROVIDERS, create_embeddings, embedding_cost_per_token, embedding_model_tag
+)
+from tokenization import count_tokens_batch
+from json_stream import iter_json_entries
+from embedding_scheduler import EmbeddingScheduler, Progress
+from constants import (
+    EMBEDDING_PROVIDER, CHROMA_DB_DIR, UNIFIED_COLLECTION_NAME,
+    EMBEDDING_MAX_CONCURRENCY, EMBEDDING_TOKENS_PER_MINUTE, EMBEDDING_REQUESTS_PER_MINUTE, EMBEDDING_MAX_RETRIES,
+    INDEX_VENUE_WORKERS
+)
 
 
-openai_api_key = os.getenv("OPENAI_API_KEY")
+# Chroma에 한 번에 추가하는 문서 수 (임베딩 요청 하나에 해당)
+ADD_BATCH_SIZE = 120
 
 
-# tiktoken을 사용하여 텍스트를 토큰화하고 토큰 수를 계산
-def count_tokens(text):
-    tokenizer = tiktoken.encoding_for_model(OPENAI_EMBEDDING_MODEL_NAME)
-    tokens = tokenizer.encode(text)
-    return len(tokens)
+# Chroma에서 한 번에 삭제/조회하는 id 수
+DELETE_BATCH_SIZE = 5000
 
-# 비동기적으로 문서 배치를 처리
-async def process_batch(batch, chroma_vector, total_tokens):
-    await chroma_vector.aadd_documents(batch)
-    
-    # 배치의 모든 문서에 대해 토큰 수를 계산하고 누적
-    batch_tokens = sum(count_tokens(doc.page_content) for doc in batch)
-    total_tokens.append(batch_tokens)
 
-def json2documents(input_json):
+def make_document_id(conference, year, title, authors, abstract):
+    """
+    Deterministic Chroma id of a document: the venue plus a hash of title, authors and abstract.
+
+    Any change in the crawled content yields a new id, so diffing ids finds
+    added, changed and removed papers without embedding anything.
+    """
+    digest = hashlib.sha256(f"{title}\0{authors}\0{abstract}".encode("utf-8")).hexdigest()[:32]
+    return f"{conference}_{year}_{digest}"
+
+
+# 비동기적으로 문서 배치를 처리 (scheduler가 동시 실행 수와 rate limit을 관리)
+async def process_batch(batch, chroma_vector):
+    await chroma_vector.aadd_documents(batch, ids=[doc.metadata["doc_id"] for doc in batch])
+
+def parse_source_file(input_json):
     source_file_name = os.path.basename(input_json)
-    conference_name = source_file_name.split('_')[0]  # 학회명 예: 'NeurIPS'
-    year = source_file_name.split('_')[1].replace('.json', '')  # 년도 예: '2023'
+    stem = os.path.splitext(source_file_name)[0]
+    conference_name = stem.split('_')[0]  # 학회명 예: 'NeurIPS'
+    year = stem.split('_')[1]  # 년도 예: '2023'
+    return source_file_name, conference_name, year
+
 
-    with open(input_json, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def iter_documents(input_json):
+    """Yield one ``Document`` per valid, distinct entry of ``input_json`` while the file is being read."""
+    source_file_name, conference_name, year = parse_source_file(input_json)
 
-    documents = []
-    for entry in data:
+    seen_ids = set()
+    for entry in iter_json_entries(input_json):
         title = entry.get('title', None)
         authors = entry.get('authors', None)
         abstract = entry.get('abstract', None)
@@ -51,87 +75,286 @@ def json2documents(input_json):
         authors = authors.strip()
         abstract = abstract.strip()
 
+        # 내용이 완전히 같은 entry는 한 번만 추가
+        doc_id = make_document_id(conference_name, year, title, authors, abstract)
+        if doc_id in seen_ids:
+            continue
+        seen_ids.add(doc_id)
+
         page_content = f"Title: {title}\nAuthors: {authors}\nAbstract: {abstract}"
         metadata = {
+            "doc_id": doc_id,
+            "paper_id": make_paper_id(conference_name, year, title, authors),
             "title": title,
             "authors": authors,
+            "abstract": abstract,
             "source_file": source_file_name,
             "conference": conference_name,
             "year": year 
         }
-        doc = Document(page_content=page_content, metadata=metadata)
-        documents.append(doc)
-    return documents
+        yield Document(page_content=page_content, metadata=metadata)
 
 
-async def main():
-    # OpenAI embeddings을 사용하여 벡터 생성
-    embeddings = OpenAIEmbeddings(
-        openai_api_key=openai_api_key,
-        model=OPENAI_EMBEDDING_MODEL_NAME
-    )
+def iter_document_batches(input_json, batch_size=ADD_BATCH_SIZE):
+    # 파일 전체를 읽기 전에 batch_size 단위로 문서를 내보냄
+    batch = []
+    for doc in iter_documents(input_json):
+        batch.append(doc)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-    input_jsons = glob.glob('./data/*.json')
-    # 파일명에서 년도가 2018 ~ 2024인 항목만 추출
-    input_jsons = [file for file in input_jsons if any(year in file for year in ['2018', '2019', '2020', '2021', '2022', '2023', '2024'])]
 
-    for input_json in input_jsons:
-        print(input_json)
-        documents_to_add = json2documents(input_json)
+def json2documents(input_json):
+    return list(iter_documents(input_json))
 
-        if len(documents_to_add) == 0:
-            print(f"pass as collection '{collection_name}' as it is empty.")
-            continue  # 이미 데이터가 있는 경우 넘어감
 
-        # 학회와 연도에 맞게 다른 collection_name 사용
-        conference_name = documents_to_add[0].metadata["conference"]
-        year = documents_to_add[0].metadata["year"]
+def find_input_files(data_dir='./data', venues=None, years=None):
+    """Return the ``data/{CONF}_{YEAR}.json(l)`` files, optionally restricted to ``venues`` and ``years``."""
+    # 같은 학회/연도의 .json과 .jsonl이 모두 있으면 .jsonl을 사용
+    input_files = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.json')) + glob.glob(os.path.join(data_dir, '*.jsonl'))):
+        _, conference_name, year = parse_source_file(path)
+        if venues and conference_name not in venues:
+            continue
+        if years and year not in years:
+            continue
+        stem = os.path.splitext(path)[0]
+        if stem not in input_files or path.endswith('.jsonl'):
+            input_files[stem] = path
+    return sorted(input_files.values())
+
+
+def existing_documents(collection, conference_name, year, unified):
+    """Return ``{id: paper_id}`` of the documents of ``conference_name``/``year`` already stored in ``collection``."""
+    if collection is None:
+        return {}
+    # unified collection에서는 해당 학회와 연도의 문서만 확인
+    # (source_file로 거르면 X.json에서 X.jsonl로 바뀌었을 때 기존 문서를 찾지 못함)
+    where = venue_filter([conference_name], [year]) if unified else None
+    existing = collection.get(where=where, include=["metadatas"])
+    return {id_: (metadata or {}).get("paper_id") for id_, metadata in zip(existing["ids"], existing["metadatas"])}
+
+
+async def index_file(input_json, args, client, embeddings, scheduler, process_pool):
+    """
+    Stream ``input_json`` into its collection, embedding only added or changed papers.
+
+    Batches are handed to the scheduler as soon as they are parsed, with at most
+    ``2 * max_concurrency`` batches waiting, so parsing overlaps with the embedding
+    calls and memory does not grow with the file size. Token counting runs in
+    ``process_pool``. Papers no longer in the file are deleted once every batch has
+    been added; if any batch failed, nothing is deleted so that a changed paper
+    keeps its old document until a re-run embeds the new one. Returns a summary
+    row for the final table.
+    """
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+    embedding_model = embedding_model_tag(args.embedding_provider)
+    cost_per_token = embedding_cost_per_token(args.embedding_provider)
+    source_file, conference_name, year = parse_source_file(input_json)
+    venue = f"{conference_name}_{year}"
+
+    # 학회와 연도에 맞게 다른 collection_name 사용 (unified 모드에서는 하나의 collection)
+    if args.unified:
+        collection_name = UNIFIED_COLLECTION_NAME
+    else:
         collection_name = f"{conference_name}_{year}_collection"
-        
-        # Chroma 벡터 스토어 생성 (학회와 연도별로 컬렉션 이름을 다르게 함)
-        chroma_vector = Chroma(
-            collection_name=collection_name,  # 학회와 연도에 맞는 컬렉션
-            embedding_function=embeddings,
-            persist_directory='chroma_dir',
-            collection_metadata={"hnsw:space": "cosine"}
-        )
 
-        # 컬렉션의 데이터 개수 확인
+    # 이미 저장된 문서와 비교하여 추가/변경/삭제된 논문만 처리
+    try:
+        collection = client.get_collection(collection_name)
+    except Exception:
+        collection = None
+
+    # 다른 임베딩 모델로 만든 collection에는 벡터를 섞지 않음
+    if collection is not None:
         try:
-            existing_collection = chroma_vector._client.get_collection(collection_name)
-            doc_count = existing_collection.count()
+            check_embedding_model(collection, embedding_model)
+        except EmbeddingModelMismatch as e:
+            print(f"[{venue}] skipped: {e}")
+            return {
+                "venue": venue, "added": 0, "changed": 0, "removed": 0, "unchanged": 0,
+                "tokens": 0, "failed_batches": 0, "seconds": time.monotonic() - started,
+            }
 
-            if doc_count == len(documents_to_add):
-                print(f"pass as collection '{collection_name}' already has {doc_count} documents.")
-                continue  # 이미 데이터가 있는 경우 넘어감
+    existing = existing_documents(collection, conference_name, year, args.unified)
 
-        except Exception as e:
-            print(f"Error retrieving collection: {e}. Proceeding to add data...")
+    chroma_vector = None
+    progress = Progress(venue)
+    seen_ids = set()
+    added_paper_ids = []
+    unchanged = 0
+    pending = set()
 
-        # Chroma에 문서 추가 (병렬 처리)
-        ADD_BATCH_SIZE = 120
-        total_tokens = []  # 사용된 토큰 수를 추적하기 위한 리스트
+    for batch_index, batch in enumerate(iter_document_batches(input_json, ADD_BATCH_SIZE)):
+        seen_ids.update(doc.metadata["doc_id"] for doc in batch)
+        new_documents = [doc for doc in batch if doc.metadata["doc_id"] not in existing]
+        unchanged += len(batch) - len(new_documents)
+        if not new_documents:
+            continue
+        added_paper_ids.extend(doc.metadata["paper_id"] for doc in new_documents)
+
+        # 배치의 토큰 수를 미리 계산하여 rate limit 예산에 사용
+        tokens = sum(await loop.run_in_executor(
+            process_pool, count_tokens_batch, [doc.page_content for doc in new_documents]
+        ))
+        progress.total_docs += len(new_documents)
+        progress.total_tokens += tokens
+        if args.dry_run:
+            continue
 
-        tasks = []
-        for start in range(0, len(documents_to_add), ADD_BATCH_SIZE):
-            print(f"Processing batch starting at index {start}")
-            batch = documents_to_add[start:start + ADD_BATCH_SIZE]
-            
-            # 각 배치를 병렬로 처리하기 위해 task 추가
-            tasks.append(process_batch(batch, chroma_vector, total_tokens))
+        if chroma_vector is None:
+            # Chroma 벡터 스토어 생성 (학회와 연도별로 컬렉션 이름을 다르게 함)
+            chroma_vector = Chroma(
+                client=client,
+                collection_name=collection_name,  # 학회와 연도에 맞는 컬렉션
+                embedding_function=embeddings,
+                collection_metadata=collection_metadata(embedding_model)
+            )
 
-        # 모든 배치들을 병렬로 처리 (await로 전체 작업이 끝날 때까지 기다림)
-        await asyncio.gather(*tasks)
+        # 대기 중인 배치가 너무 많으면 하나가 끝날 때까지 파싱을 멈춤
+        if len(pending) >= 2 * args.max_concurrency:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        pending.add(asyncio.ensure_future(scheduler.submit(
+            lambda batch=new_documents: process_batch(batch, chroma_vector),
+            progress, batch_index, len(new_documents), tokens
+        )))
+        # 방금 추가한 배치가 바로 시작되도록 event loop에 양보
+        await asyncio.sleep(0)
 
-        # 총 사용된 토큰 계산
-        total_tokens_used = sum(total_tokens)
-        total_cost = total_tokens_used * COST_PER_TOKEN
+    if pending:
+        await asyncio.wait(pending)
 
-        print(f"Added {len(documents_to_add)} documents to Chroma.")
-        print(f"Total tokens used: {total_tokens_used}")
-        print(f"Total cost for this request: ${total_cost:.6f}")
+    ids_to_delete = [id_ for id_ in existing if id_ not in seen_ids]
+    deleted_paper_ids = {existing[id_] for id_ in ids_to_delete}
+    changed = sum(1 for paper_id in added_paper_ids if paper_id in deleted_paper_ids)
+
+    summary = {
+        "venue": venue,
+        "added": len(added_paper_ids) - changed,
+        "changed": changed,
+        "removed": len(ids_to_delete) - changed,
+        "unchanged": unchanged,
+        "tokens": progress.total_tokens if args.dry_run else progress.done_tokens,
+        "failed_batches": len(progress.failed_batches),
+    }
+
+    print(
+        f"[{venue}] '{collection_name}': {summary['added']} added, {changed} changed, "
+        f"{summary['removed']} removed, {unchanged} unchanged."
+    )
+    if args.dry_run:
+        print(f"[dry-run] [{venue}] would embed {progress.total_tokens} tokens (${progress.total_tokens * cost_per_token:.6f}).")
+        summary["seconds"] = time.monotonic() - started
+        return summary
+    if not added_paper_ids and not ids_to_delete:
+        print(f"[{venue}] pass as collection '{collection_name}' is up to date.")
+        summary["seconds"] = time.monotonic() - started
+        return summary
+
+    # 더 이상 JSON에 없는 (또는 내용이 바뀐) 문서는 새 문서를 추가한 뒤 삭제
+    # 실패한 배치가 있으면 바뀐 논문의 새 문서가 없을 수 있으므로 삭제 단계를 통째로 건너뜀 (다시 실행하면 처리됨)
+    deleted = 0
+    if ids_to_delete and progress.failed_batches:
+        print(
+            f"[{venue}] Skipped deleting {len(ids_to_delete)} stale documents because "
+            f"{len(progress.failed_batches)} batches failed; re-run to retry them."
+        )
+    elif ids_to_delete:
+        collection = client.get_collection(collection_name)
+        for start in range(0, len(ids_to_delete), DELETE_BATCH_SIZE):
+            collection.delete(ids=ids_to_delete[start:start + DELETE_BATCH_SIZE])
+        deleted = len(ids_to_delete)
+
+    # 총 사용된 토큰 계산 (실패한 배치는 제외)
+    total_tokens_used = progress.done_tokens
+    total_cost = total_tokens_used * cost_per_token
+
+    print(f"[{venue}] Added {progress.done_docs} and deleted {deleted} documents in {progress.elapsed:.1f}s.")
+    print(f"[{venue}] Total tokens used: {total_tokens_used}")
+    print(f"[{venue}] Total cost for this request: ${total_cost:.6f}")
+    if progress.failed_batches:
+        print(f"[{venue}] Failed batches for '{collection_name}': {progress.failed_batches}")
+
+    summary["seconds"] = time.monotonic() - started
+    return summary
+
+
+def print_summary(summaries, dry_run, cost_per_token):
+    # 학회/연도별 소요 시간, 토큰 수, 비용을 표로 출력
+    token_header = "projected tokens" if dry_run else "tokens"
+    print()
+    print(f"{'venue':<18} {'added':>7} {'changed':>8} {'removed':>8} {'failed':>7} {'time (s)':>9} {token_header:>17} {'cost ($)':>10}")
+    for summary in summaries:
+        print(
+            f"{summary['venue']:<18} {summary['added']:>7} {summary['changed']:>8} {summary['removed']:>8} "
+            f"{summary['failed_batches']:>7} {summary['seconds']:>9.1f} {summary['tokens']:>17} "
+            f"{summary['tokens'] * cost_per_token:>10.6f}"
+        )
+    total_tokens = sum(summary['tokens'] for summary in summaries)
+    print(f"{'total':<18} {'':>7} {'':>8} {'':>8} {'':>7} {'':>9} {total_tokens:>17} {total_tokens * cost_per_token:>10.6f}")
+
+
+async def main(args):
+    # 설정된 provider의 embeddings을 사용하여 벡터 생성 (OpenAI 요청의 재시도는 scheduler가 담당)
+    if args.embedding_provider == "openai":
+        embeddings = create_embeddings("openai", max_retries=0)
+    else:
+        embeddings = create_embeddings(args.embedding_provider)
+    client = create_client(CHROMA_DB_DIR)
+    scheduler = EmbeddingScheduler(
+        max_concurrency=args.max_concurrency,
+        tokens_per_minute=args.tokens_per_minute,
+        requests_per_minute=args.requests_per_minute,
+        max_retries=args.max_retries
+    )
+
+    input_jsons = find_input_files(venues=args.venues, years=args.years)
+
+    # 여러 학회/연도를 동시에 처리 (임베딩 예산은 scheduler 하나를 공유)
+    venue_semaphore = asyncio.Semaphore(args.venue_workers)
+
+    async def index_venue(input_json):
+        async with venue_semaphore:
+            print(input_json)
+            return await index_file(input_json, args, client, embeddings, scheduler, process_pool)
+
+    with ProcessPoolExecutor(max_workers=args.venue_workers) as process_pool:
+        summaries = await asyncio.gather(*[index_venue(input_json) for input_json in input_jsons])
+
+    print_summary(summaries, args.dry_run, embedding_cost_per_token(args.embedding_provider))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Embed the crawled papers in ./data into Chroma collections.")
+    parser.add_argument(
+        "--unified", action="store_true",
+        help=f"store every venue in the single '{UNIFIED_COLLECTION_NAME}' collection instead of one collection per venue-year"
+    )
+    parser.add_argument("--embedding-provider", choices=EMBEDDING_PROVIDERS, default=EMBEDDING_PROVIDER,
+                        help="embedding backend; 'local' runs a CPU sentence-transformers model with no network")
+    parser.add_argument("--venues", nargs="+", metavar="CONFERENCE",
+                        help="only index these conferences, e.g. --venues ICML NeurIPS (default: all)")
+    parser.add_argument("--years", nargs="+", metavar="YEAR",
+                        help="only index these years, e.g. --years 2023 2024 (default: all)")
+    parser.add_argument("--venue-workers", type=int, default=INDEX_VENUE_WORKERS,
+                        help="number of venue files indexed concurrently")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report the added/changed/removed papers and the projected token cost")
+    parser.add_argument("--max-concurrency", type=int, default=EMBEDDING_MAX_CONCURRENCY,
+                        help="maximum number of embedding batches in flight")
+    parser.add_argument("--tokens-per-minute", type=int, default=EMBEDDING_TOKENS_PER_MINUTE,
+                        help="embedding token budget per minute (0 disables the limit)")
+    parser.add_argument("--requests-per-minute", type=int, default=EMBEDDING_REQUESTS_PER_MINUTE,
+                        help="embedding request budget per minute (0 disables the limit)")
+    parser.add_argument("--max-retries", type=int, default=EMBEDDING_MAX_RETRIES,
+                        help="retries per batch before it is reported as failed")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
     # asyncio를 사용하여 비동기 main 함수를 실행
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,139 @@
+import os
+import json
+import threading
+
+import numpy as np
+from langchain.schema.document import Document
+
+from chroma_store import EmbeddingModelMismatch, collection_name_for, legacy_abstract, parse_collection_name
+from constants import NUMPY_INDEX_DIR
+
+# 한 번에 Chroma에서 읽어오는 문서 수
+EXPORT_PAGE_SIZE = 5000
+
+
+def export_collection(collection, index_dir=NUMPY_INDEX_DIR):
+    """
+    Dump ``collection`` to ``{name}.npy`` (L2-normalized float32 rows) and ``{name}.json`` (ids and metadata).
+
+    Returns the number of exported documents.
+    """
+    ids, metadatas, vectors = [], [], []
+    total = collection.count()
+    for offset in range(0, total, EXPORT_PAGE_SIZE):
+        page = collection.get(limit=EXPORT_PAGE_SIZE, offset=offset, include=["embeddings", "metadatas", "documents"])
+        ids.extend(page["ids"])
+        for metadata, document in zip(page["metadatas"], page["documents"]):
+            metadata = dict(metadata)
+            # abstract metadata가 없는 예전 collection은 page_content에서 추출
+            metadata.setdefault("abstract", legacy_abstract(document))
+            metadatas.append(metadata)
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+
+    matrix = np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    # 코사인 유사도를 내적 한 번으로 계산할 수 있도록 미리 정규화
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.maximum(norms, 1e-12)
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, f"{collection.name}.npy"), matrix)
+    with open(os.path.join(index_dir, f"{collection.name}.json"), 'w', encoding='utf-8') as f:
+        json.dump({"ids": ids, "metadatas": metadatas}, f, ensure_ascii=False)
+    return len(ids)
+
+
+class NumpyIndex:
+    """
+    Exact cosine search over the per-venue matrices written by ``export_numpy.py``.
+
+    Matrices are memory-mapped and already normalized, so a query costs one
+    matrix-vector product per selected venue followed by a single ``argpartition``
+    over the concatenated scores. Metadata files are loaded lazily per venue.
+    """
+
+    def __init__(self, embedding_model, index_dir=NUMPY_INDEX_DIR):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest["embedding_model"] != embedding_model:
+            raise EmbeddingModelMismatch(
+                f"The numpy index in '{index_dir}' was embedded with '{manifest['embedding_model']}', "
+                f"but the current embedding model is '{embedding_model}'."
+            )
+
+        self.matrices = {}
+        for collection_name in manifest["collections"]:
+            venue = parse_collection_name(collection_name)
+            if venue is not None:
+                self.matrices[venue] = np.load(os.path.join(index_dir, f"{collection_name}.npy"), mmap_mode="r")
+
+        self._metadata = {}
+        self._lock = threading.Lock()
+
+    @property
+    def venues(self):
+        return sorted(self.matrices)
+
+    def metadata(self, venue):
+        with self._lock:
+            if venue not in self._metadata:
+                path = os.path.join(self.index_dir, f"{collection_name_for(*venue)}.json")
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._metadata[venue] = json.load(f)["metadatas"]
+            return self._metadata[venue]
+
+    def search_many(self, venues, query_embeddings, k):
+        """
+        Return the global top ``k`` of ``venues`` for every query embedding.
+
+        All queries are scored with one matrix-matrix product per venue. Each result
+        list holds ``(score, conference, year, Document)`` tuples.
+        """
+        venues = [venue for venue in venues if venue in self.matrices and len(self.matrices[venue])]
+        queries = np.array(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        if not venues or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        # (문서 수, 쿼리 수) 크기의 점수 행렬
+        scores = np.concatenate([self.matrices[venue] @ queries.T for venue in venues])
+        offsets = np.cumsum([0] + [len(self.matrices[venue]) for venue in venues])
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+
+        all_candidates = []
+        for query_index in range(len(queries)):
+            query_scores = scores[:, query_index]
+            query_top = top[:, query_index]
+            query_top = query_top[np.argsort(-query_scores[query_top])]
+
+            candidates = []
+            for row in query_top:
+                venue_index = int(np.searchsorted(offsets, row, side="right")) - 1
+                conference, year = venues[venue_index]
+                metadata = self.metadata(venues[venue_index])[row - offsets[venue_index]]
+                candidates.append((float(query_scores[row]), conference, year, Document(page_content="", metadata=metadata)))
+            all_candidates.append(candidates)
+        return all_candidates
+
+    def search(self, venues, query_embedding, k):
+        """Return the global top ``k`` of ``venues`` as ``(score, conference, year, Document)`` tuples."""
+        return self.search_many(venues, [query_embedding], k)[0]
+
+    def embedding(self, venue, paper_id):
+        """Return the stored (normalized) embedding of ``paper_id`` in ``venue``, or None."""
+        if venue not in self.matrices:
+            return None
+        for row, metadata in enumerate(self.metadata(venue)):
+            if metadata.get("paper_id") == paper_id:
+                return np.array(self.matrices[venue][row]).tolist()
+        return None
+
+    def warm_up(self, venue, k=10):
+        """Fault in the matrix and metadata of ``venue`` by searching it with its first row."""
+        matrix = self.matrices.get(venue)
+        if matrix is None or not len(matrix):
+            return 0
+        return len(self.search([venue], np.array(matrix[0]), k))
@@ -0,0 +1,191 @@
+"""
+Crawl several venues and years concurrently in one Scrapy process.
+
+Run it from this directory (next to scrapy.cfg):
+
+    python crawl.py                                   # every venue/year of scripts/crawl_*.sh
+    python crawl.py --venues CVPR ICCV --years 2023
+    python crawl.py --venues ICLR ICML --fast --no-http-cache    # compare with the same run without --fast
+
+Papers are appended to data/{CONFERENCE}_{YEAR}.jsonl (JSON Lines) by the item
+pipeline while the crawl runs. Like the shell scripts, a venue-year whose output
+file (.json or .jsonl) already exists is skipped; with --append, an existing
+.jsonl is crawled again and only papers not yet in it are appended.
+Every spider crawls one site, so at most --crawlers-per-site crawls of the same
+spider run at once (each limited to --requests-per-domain concurrent requests),
+while different sites are crawled in parallel. A per-crawl summary of requests,
+pages, items, bytes, HTTP cache hits/revalidations/misses and elapsed time is
+printed at the end.
+
+With --fast, the spiders that support it read titles, authors and abstracts
+from the bulk sources of their site (ICLR/NeurIPS paper JSON, ICML BibTeX, the
+EMNLP anthology listing) and only request the pages of papers whose abstract
+is missing there. Other spiders ignore --fast.
+"""
+
+import os
+import time
+import argparse
+
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+
+# 학회별 spider, spider 인자, 수집할 연도 (scripts/crawl_*.sh와 동일)
+VENUES = {
+    "AAAI": ("aaai_paper_spider", {}, (2024, 2023, 2022, 2021, 2020, 2019, 2018)),
+    "CVPR": ("cvf_paper_spider", {"conference": "CVPR"}, (2024, 2023, 2022, 2021)),
+    "ECCV": ("eccv_paper_spider", {}, (2024, 2022, 2020, 2018)),
+    "EMNLP": ("emnlp_paper_spider", {}, (2023, 2022, 2021, 2020, 2019, 2018)),
+    "ICCV": ("cvf_paper_spider", {"conference": "ICCV"}, (2023, 2021)),
+    "ICLR": ("iclr_paper_spider", {}, (2024, 2023, 2022, 2021, 2020, 2019, 2018)),
+    "ICML": ("icml_paper_spider", {}, (2024, 2023, 2022, 2021, 2020, 2019, 2018)),
+    "ICRA": ("ieee_paper_spider", {"conference": "ICRA"}, (2024, 2023, 2022, 2021, 2020, 2019, 2018)),
+    "IJCAI": ("ijcai_paper_spider", {}, (2024, 2023, 2022, 2021, 2020, 2019, 2018)),
+    "Interspeech": ("interspeech_paper_spider", {}, (2024, 2023, 2022, 2021, 2020, 2019, 2018)),
+    "ISMIR": ("ismir_paper_spider", {}, (2023, 2022, 2021)),
+    "NeurIPS": ("neurips_paper_spider", {}, (2022, 2021, 2020, 2019, 2018)),
+}
+# fast 인자를 받는 spider
+FAST_MODE_SPIDERS = ("emnlp_paper_spider", "iclr_paper_spider", "icml_paper_spider", "neurips_paper_spider")
+
+
+def plan_jobs(data_dir, venues=None, years=None, fast=False, append=False):
+    """Return the crawl jobs to run, grouped by spider, skipping venue-years whose output already exists."""
+    jobs = {}
+    for conference, (spider_name, spider_kwargs, venue_years) in VENUES.items():
+        if venues and conference not in venues:
+            continue
+        for year in venue_years:
+            if years and str(year) not in years:
+                continue
+            output_file = os.path.join(data_dir, f"{conference}_{year}.jsonl")
+            # 예전 'scrapy crawl -O'로 만든 .json이 있거나, --append 없이 .jsonl이 있으면 건너뜀
+            if os.path.exists(output_file[:-1]) or (os.path.exists(output_file) and not append):
+                print(f"File for {conference} {year} already exists. Skipping...")
+                continue
+            kwargs = {**spider_kwargs, "year": str(year)}
+            if fast and spider_name in FAST_MODE_SPIDERS:
+                kwargs["fast"] = "1"
+            jobs.setdefault(spider_name, []).append({
+                "venue": f"{conference}_{year}",
+                "spider": spider_name,
+                "kwargs": kwargs,
+                "output_file": output_file,
+            })
+    return jobs
+
+
+def run_in_turn(process, settings, jobs, summaries):
+    """Crawl ``jobs`` one after another and append one summary per job to ``summaries``."""
+    from twisted.internet import defer
+
+    @defer.inlineCallbacks
+    def run():
+        for job in jobs:
+            crawler_settings = settings.copy()
+            # 논문은 PaperSpiderPipeline이 JSON Lines 파일에 추가함
+            crawler_settings.set("PAPER_OUTPUT_FILE", job["output_file"])
+            crawler = Crawler(process.spider_loader.load(job["spider"]), crawler_settings)
+
+            print(f"Scraping data for {job['venue']}...")
+            start = time.monotonic()
+            error = None
+            try:
+                yield process.crawl(crawler, **job["kwargs"])
+            except Exception as e:
+                error = str(e)
+
+            stats = crawler.stats.get_stats() if crawler.stats else {}
+            summaries.append({
+                "venue": job["venue"],
+                "spider": job["spider"],
+                "requests": stats.get("downloader/request_count", 0),
+                "pages": stats.get("response_received_count", 0),
+                "items": stats.get("item_scraped_count", 0),
+                "bytes": stats.get("downloader/response_bytes", 0),
+                "cache": tuple(stats.get(f"httpcache/{key}", 0) for key in ("hit", "revalidate", "miss")),
+                "seconds": time.monotonic() - start,
+                "status": error or stats.get("finish_reason", "unknown"),
+            })
+
+    return run()
+
+
+def print_summary(summaries):
+    # 크롤링별 요청 수, 페이지 수, 항목 수, 다운로드 크기, HTTP 캐시 적중/재검증/미스, 소요 시간을 표로 출력
+    print()
+    print(
+        f"{'venue':<18} {'spider':<26} {'requests':>8} {'pages':>7} {'items':>7} {'MB':>8} "
+        f"{'hit':>7} {'reval':>7} {'miss':>7} {'time (s)':>9}  status"
+    )
+    for summary in sorted(summaries, key=lambda summary: summary["venue"]):
+        hits, revalidations, misses = summary["cache"]
+        print(
+            f"{summary['venue']:<18} {summary['spider']:<26} {summary['requests']:>8} {summary['pages']:>7} {summary['items']:>7} "
+            f"{summary['bytes'] / 1e6:>8.1f} {hits:>7} {revalidations:>7} {misses:>7} "
+            f"{summary['seconds']:>9.1f}  {summary['status']}"
+        )
+    totals = [sum(summary["cache"][index] for summary in summaries) for index in range(3)]
+    print(
+        f"{'total':<18} {'':<26} {sum(summary['requests'] for summary in summaries):>8} "
+        f"{sum(summary['pages'] for summary in summaries):>7} "
+        f"{sum(summary['items'] for summary in summaries):>7} {sum(summary['bytes'] for summary in summaries) / 1e6:>8.1f} "
+        f"{totals[0]:>7} {totals[1]:>7} {totals[2]:>7}"
+    )
+
+
+def main(args):
+    jobs = plan_jobs(args.data_dir, args.venues, args.years, args.fast, args.append)
+    if not jobs:
+        print("Nothing to crawl.")
+        return
+
+    settings = get_project_settings()
+    settings.set("CONCURRENT_REQUESTS_PER_DOMAIN", args.requests_per_domain)
+    if args.no_http_cache:
+        settings.set("HTTPCACHE_ENABLED", False)
+    process = CrawlerProcess(settings)
+    # Crawler를 직접 만들면 reactor가 설치되지 않으므로, settings의 TWISTED_REACTOR를 먼저 설치한 뒤 import
+    install_reactor(settings["TWISTED_REACTOR"])
+    from twisted.internet import defer, reactor
+
+    # 같은 사이트를 크롤링하는 작업은 최대 crawlers_per_site개의 순차 실행 흐름으로 나눔
+    summaries = []
+    runs = []
+    for spider_jobs in jobs.values():
+        for lane in range(args.crawlers_per_site):
+            lane_jobs = spider_jobs[lane::args.crawlers_per_site]
+            if lane_jobs:
+                runs.append(run_in_turn(process, settings, lane_jobs, summaries))
+
+    start = time.monotonic()
+    defer.DeferredList(runs).addBoth(lambda _: reactor.stop())
+    process.start(stop_after_crawl=False)
+
+    print_summary(summaries)
+    print(f"Crawled {len(summaries)} venue-years in {time.monotonic() - start:.1f}s ({'fast' if args.fast else 'normal'} mode).")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=os.path.join("..", "data"))
+    parser.add_argument("--venues", nargs="+", metavar="CONFERENCE", choices=sorted(VENUES),
+                        help="only crawl these conferences, e.g. --venues CVPR ICLR (default: all)")
+    parser.add_argument("--years", nargs="+", metavar="YEAR",
+                        help="only crawl these years, e.g. --years 2023 2024 (default: all)")
+    parser.add_argument("--crawlers-per-site", type=int, default=1,
+                        help="number of venue-years of the same site crawled at the same time")
+    parser.add_argument("--requests-per-domain", type=int, default=8,
+                        help="concurrent requests of one crawl to the same domain")
+    parser.add_argument("--fast", action="store_true",
+                        help="read papers from bulk listings/exports and only fetch pages of papers missing an abstract")
+    parser.add_argument("--append", action="store_true",
+                        help="crawl venue-years whose .jsonl file exists again and append the papers missing from it")
+    parser.add_argument("--no-http-cache", action="store_true",
+                        help="download every page instead of using the HTTP cache (for timing comparisons)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,175 @@
+"""
+Downloader middleware that renders pages in a pool of headless browsers.
+
+``scrapy_selenium.SeleniumMiddleware`` drives a single browser from the reactor
+thread, so every JavaScript page blocks the whole crawl until it is rendered.
+``BrowserPoolMiddleware`` keeps up to ``BROWSER_POOL_SIZE`` browser sessions and
+renders up to that many pages at the same time in worker threads, while the
+reactor keeps downloading plain requests.
+
+A request is rendered in a browser when ``request.meta["render_js"]`` is true;
+the flag defaults to true for ``SeleniumRequest`` and false for everything
+else, so a spider can send a ``SeleniumRequest`` whose page does not need
+JavaScript through the normal downloader with ``meta={"render_js": False}``.
+The ``wait_time``, ``wait_until``, ``screenshot`` and ``script`` arguments of
+``SeleniumRequest`` behave as with ``scrapy_selenium``; the browser itself is
+not exposed in ``response.meta["driver"]`` because it goes back to the pool as
+soon as the page is rendered.
+
+Browsers are created lazily by the callable named in
+``BROWSER_POOL_DRIVER_FACTORY`` (``create_driver`` by default, configured by the
+``SELENIUM_*`` settings) and quit when the spider closes.
+"""
+
+import queue
+import logging
+import threading
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse
+from scrapy.utils.misc import load_object
+from scrapy_selenium import SeleniumRequest
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
+from selenium.webdriver.support.ui import WebDriverWait
+from twisted.internet import threads
+from twisted.python.threadpool import ThreadPool
+
+logger = logging.getLogger(__name__)
+
+
+def create_driver(settings):
+    """Start one browser configured by ``SELENIUM_DRIVER_NAME``, ``SELENIUM_DRIVER_EXECUTABLE_PATH`` and ``SELENIUM_DRIVER_ARGUMENTS``."""
+    driver_name = settings.get("SELENIUM_DRIVER_NAME", "chrome").lower()
+    webdriver_base_path = f"selenium.webdriver.{driver_name}"
+    driver_klass = load_object(f"{webdriver_base_path}.webdriver.WebDriver")
+    options = load_object(f"{webdriver_base_path}.options.Options")()
+    for argument in settings.getlist("SELENIUM_DRIVER_ARGUMENTS"):
+        options.add_argument(argument)
+    service = load_object(f"{webdriver_base_path}.service.Service")(
+        executable_path=settings.get("SELENIUM_DRIVER_EXECUTABLE_PATH")
+    )
+    return driver_klass(options=options, service=service)
+
+
+class BrowserPool:
+    """Up to ``size`` browser sessions, each lent to one worker thread at a time."""
+
+    def __init__(self, create_driver_fn, size):
+        self.size = size
+        self._create_driver = create_driver_fn
+        self._idle = queue.LifoQueue()
+        self._drivers = []
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # 쉬는 브라우저가 없으면 size개까지 새로 띄우고, 그 이상이면 반납될 때까지 기다림
+        with self._lock:
+            create = self._idle.empty() and self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            driver = self._create_driver()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def release(self, driver):
+        self._idle.put(driver)
+
+    def discard(self, driver):
+        # 세션이 끊긴 브라우저는 풀에서 빼고, 다음 acquire에서 새로 띄움
+        with self._lock:
+            self._drivers.remove(driver)
+            self._created -= 1
+        _quit(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            _quit(driver)
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        logger.warning("Could not quit a browser session", exc_info=True)
+
+
+class BrowserPoolMiddleware:
+    """Render JavaScript requests in a pool of browsers and leave the others to Scrapy's downloader."""
+
+    def __init__(self, create_driver_fn, pool_size, stats):
+        self.pool = BrowserPool(create_driver_fn, pool_size)
+        self.threadpool = ThreadPool(minthreads=0, maxthreads=pool_size, name="browser-pool")
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        pool_size = settings.getint("BROWSER_POOL_SIZE", 4)
+        if pool_size < 1:
+            raise NotConfigured("BROWSER_POOL_SIZE must be at least 1")
+        driver_factory = load_object(settings.get("BROWSER_POOL_DRIVER_FACTORY", create_driver))
+
+        middleware = cls(lambda: driver_factory(settings), pool_size, crawler.stats)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.threadpool.start()
+        logger.debug("Rendering JavaScript pages with up to %d browsers", self.pool.size, extra={"spider": spider})
+
+    def spider_closed(self, spider):
+        self.threadpool.stop()
+        self.pool.close()
+
+    def needs_browser(self, request):
+        # SeleniumRequest는 기본적으로 브라우저로, 그 외 요청은 기본적으로 Scrapy 다운로더로 보냄
+        return request.meta.get("render_js", isinstance(request, SeleniumRequest))
+
+    def process_request(self, request, spider):
+        if not self.needs_browser(request):
+            return None
+        from twisted.internet import reactor
+
+        self.stats.inc_value("browser_pool/request_count", spider=spider)
+        return threads.deferToThreadPool(reactor, self.threadpool, self.render, request)
+
+    def render(self, request):
+        """Load ``request`` in a pooled browser and return the rendered page (runs in a worker thread)."""
+        driver = self.pool.acquire()
+        try:
+            driver.get(request.url)
+            for cookie_name, cookie_value in request.cookies.items():
+                driver.add_cookie({"name": cookie_name, "value": cookie_value})
+
+            wait_until = getattr(request, "wait_until", None)
+            if wait_until:
+                WebDriverWait(driver, getattr(request, "wait_time", None) or 0).until(wait_until)
+            if getattr(request, "screenshot", False):
+                request.meta["screenshot"] = driver.get_screenshot_as_png()
+            if getattr(request, "script", None):
+                driver.execute_script(request.script)
+
+            body = str.encode(driver.page_source)
+            url = driver.current_url
+        except (InvalidSessionIdException, NoSuchWindowException):
+            self.pool.discard(driver)
+            raise
+        except Exception:
+            self.pool.release(driver)
+            raise
+        self.pool.release(driver)
+        return HtmlResponse(url, body=body, encoding="utf-8", request=request)
+
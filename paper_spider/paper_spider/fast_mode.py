@@ -0,0 +1,101 @@
+"""
+Helpers shared by the spiders that support ``-a fast=1``.
+
+``parse_flag`` reads a boolean spider argument. ``VirtualSiteJsonMixin`` reads
+titles, authors and abstracts from the paper JSON of a conference's virtual
+site (iclr.cc, nips.cc) instead of requesting one page per paper, and falls
+back to the spider's normal ``parse`` when the JSON is missing or holds no
+paper of ``paper_types``.
+"""
+
+import json
+
+import scrapy
+from w3lib.html import remove_tags
+
+
+def parse_flag(value):
+    """Return whether a spider argument such as ``-a fast=1`` is set."""
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+class VirtualSiteJsonMixin:
+    """
+    Fast mode of the virtual-site spiders; mix in before ``scrapy.Spider``.
+
+    A spider sets ``conference_name`` (for log messages), ``site_url``,
+    ``json_name``, ``paper_types`` and, if its JSON differs from the defaults,
+    the field mapping ``json_fields`` and ``json_type_fields``. It provides
+    ``self.year``, ``self.fast``, ``parse`` (the schedule page) and
+    ``parse_paper_details`` (one paper page, with ``title`` and ``paper_id`` in
+    ``response.meta``).
+    """
+
+    conference_name = None
+    site_url = None
+    json_name = None
+    paper_types = ()
+    # 논문 JSON의 필드 이름
+    json_fields = {'id': 'id', 'title': 'name', 'authors': 'authors', 'author_name': 'fullname', 'abstract': 'abstract'}
+    # 발표 유형이 들어 있을 수 있는 필드 (연도마다 다름)
+    json_type_fields = ('eventtype', 'event_type', 'decision')
+
+    def schedule_url(self):
+        return f"{self.site_url}/Conferences/{self.year}/Schedule"
+
+    def paper_url(self, paper_id):
+        return f"{self.schedule_url()}?showEvent={paper_id}"
+
+    def start_requests(self):
+        if not self.fast:
+            yield from super().start_requests()
+            return
+        yield scrapy.Request(
+            f"{self.site_url}/static/virtual/data/{self.json_name}-{self.year}-orals-posters.json",
+            callback=self.parse_json,
+            errback=self.parse_json_failed,
+        )
+
+    def parse_json(self, response):
+        try:
+            papers = json.loads(response.text)['results']
+        except (ValueError, KeyError):
+            yield from self.parse_json_failed(None)
+            return
+
+        fields = self.json_fields
+        accepted = 0
+        for paper in papers:
+            if not any(paper.get(field) in self.paper_types for field in self.json_type_fields):
+                continue
+            accepted += 1
+            title = (paper.get(fields['title']) or '').strip()
+            authors = ', '.join(
+                author[fields['author_name']].strip()
+                for author in paper.get(fields['authors']) or [] if author.get(fields['author_name'])
+            )
+            abstract = remove_tags(paper.get(fields['abstract']) or '').strip()
+
+            if abstract:
+                yield {
+                    'title': title,
+                    'authors': authors,
+                    'abstract': abstract
+                }
+            else:
+                # 초록이 없는 논문만 논문별 페이지에서 가져옴
+                paper_id = paper[fields['id']]
+                yield scrapy.Request(
+                    self.paper_url(paper_id), callback=self.parse_paper_details, meta={'title': title, 'paper_id': paper_id}
+                )
+
+        if not accepted:
+            # 수집할 유형의 논문이 하나도 없으면 JSON 형식이 다른 것으로 보고 일반 모드로 크롤링
+            yield from self.parse_json_failed(None)
+
+    def parse_json_failed(self, failure):
+        # JSON을 제공하지 않는 연도는 일반 모드처럼 Schedule 페이지를 크롤링
+        self.logger.warning(
+            f"No usable paper JSON for {self.conference_name} {self.year}, crawling the schedule page instead"
+        )
+        yield scrapy.Request(self.schedule_url(), callback=self.parse, dont_filter=True)
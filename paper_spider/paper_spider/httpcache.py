@@ -0,0 +1,146 @@
+"""
+Persistent HTTP cache for the paper spiders.
+
+``SqliteCacheStorage`` keeps one zlib-compressed row per response in
+``{HTTPCACHE_DIR}/{spider name}.sqlite3``. ``VenueFreshnessPolicy`` decides how
+long a cached page is used without asking the server again, per spider and
+conference year; once a page is stale it is revalidated with
+``If-None-Match``/``If-Modified-Since`` when the server sent an ETag or
+Last-Modified header, and downloaded again otherwise. ``HttpCacheMiddleware``
+stores revalidated pages again so that they are fresh for the next run.
+
+Scrapy's cache middleware counts ``httpcache/hit``, ``httpcache/revalidate``,
+``httpcache/miss`` (and ``httpcache/store``, ``httpcache/invalidate``) in the
+crawl stats.
+"""
+
+import os
+import time
+import zlib
+import pickle
+import logging
+import datetime
+import sqlite3
+from email.utils import formatdate
+
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware as ScrapyHttpCacheMiddleware
+from scrapy.extensions.httpcache import RFC2616Policy
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteCacheStorage:
+    """Cache storage with one SQLite database per spider and zlib-compressed responses."""
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings["HTTPCACHE_DIR"], createdir=True)
+        self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.compression_level = settings.getint("HTTPCACHE_COMPRESSION_LEVEL", 6)
+        self.db = None
+
+    def open_spider(self, spider):
+        dbpath = os.path.join(self.cachedir, f"{spider.name}.sqlite3")
+        # 같은 spider의 크롤링이 동시에 실행될 수 있으므로 WAL과 autocommit 사용
+        self.db = sqlite3.connect(dbpath, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(fingerprint TEXT PRIMARY KEY, url TEXT NOT NULL, stored_at REAL NOT NULL, data BLOB NOT NULL)"
+        )
+        logger.debug("Using SQLite cache storage in %s", dbpath, extra={"spider": spider})
+
+        self._fingerprinter = spider.crawler.request_fingerprinter
+
+    def close_spider(self, spider):
+        self.db.close()
+
+    def retrieve_response(self, spider, request):
+        key = self._fingerprinter.fingerprint(request).hex()
+        row = self.db.execute("SELECT stored_at, data FROM responses WHERE fingerprint = ?", (key,)).fetchone()
+        if row is None:
+            return None  # not cached
+        stored_at, blob = row
+        if 0 < self.expiration_secs < time.time() - stored_at:
+            return None  # expired
+
+        data = pickle.loads(zlib.decompress(blob))
+        url = data["url"]
+        headers = Headers(data["headers"])
+        body = data["body"]
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=data["status"], body=body)
+
+    def store_response(self, spider, request, response):
+        key = self._fingerprinter.fingerprint(request).hex()
+        data = {
+            "status": response.status,
+            "url": response.url,
+            "headers": dict(response.headers),
+            "body": response.body,
+        }
+        blob = zlib.compress(pickle.dumps(data, protocol=4), self.compression_level)
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (fingerprint, url, stored_at, data) VALUES (?, ?, ?, ?)",
+            (key, response.url, time.time(), blob),
+        )
+
+
+class VenueFreshnessPolicy(RFC2616Policy):
+    """
+    RFC 2616 policy whose freshness lifetime comes from the crawled venue instead of the response headers.
+
+    Proceedings of past years are kept for ``HTTPCACHE_ARCHIVE_FRESHNESS_SECS``,
+    the current year (or a spider without a ``year``) for
+    ``HTTPCACHE_FRESHNESS_SECS``; ``HTTPCACHE_SPIDER_FRESHNESS_SECS`` overrides
+    both per spider name. Responses with a status in
+    ``HTTPCACHE_IGNORE_HTTP_CODES`` are never stored.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.ignore_http_codes = [int(code) for code in settings.getlist("HTTPCACHE_IGNORE_HTTP_CODES")]
+        self.default_freshness = settings.getint("HTTPCACHE_FRESHNESS_SECS")
+        self.archive_freshness = settings.getint("HTTPCACHE_ARCHIVE_FRESHNESS_SECS")
+        self.spider_freshness = settings.getdict("HTTPCACHE_SPIDER_FRESHNESS_SECS")
+        self.freshness_lifetime = self.default_freshness
+
+    def open_spider(self, spider):
+        year = getattr(spider, "year", None)
+        if spider.name in self.spider_freshness:
+            self.freshness_lifetime = int(self.spider_freshness[spider.name])
+        elif year and str(year).isdigit() and int(year) < datetime.date.today().year:
+            self.freshness_lifetime = self.archive_freshness
+        else:
+            self.freshness_lifetime = self.default_freshness
+        logger.debug("Cached pages of %s are fresh for %ds", spider.name, self.freshness_lifetime)
+
+    def should_cache_response(self, response, request):
+        if response.status in self.ignore_http_codes:
+            return False
+        return super().should_cache_response(response, request)
+
+    def _compute_freshness_lifetime(self, response, request, now):
+        return self.freshness_lifetime
+
+
+class HttpCacheMiddleware(ScrapyHttpCacheMiddleware):
+    """Scrapy's cache middleware that also refreshes the stored copy of revalidated pages."""
+
+    def spider_opened(self, spider):
+        super().spider_opened(spider)
+        if hasattr(self.policy, "open_spider"):
+            self.policy.open_spider(spider)
+
+    def process_response(self, request, response, spider):
+        cachedresponse = request.meta.get("cached_response")
+        result = super().process_response(request, response, spider)
+        if cachedresponse is not None and result is cachedresponse:
+            # 서버가 변경되지 않았다고 응답(304)한 페이지는 받은 시각을 갱신해 다시 저장
+            cachedresponse.headers["Date"] = formatdate(usegmt=True)
+            cachedresponse.headers.pop("Age", None)
+            self.storage.store_response(spider, request, cachedresponse)
+        return result
@@ -3,11 +3,125 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import os
+import json
+import time
+import hashlib
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.exceptions import DropItem
+
+# 모든 논문에 있어야 하는 필드 (make_chroma.py가 색인하는 논문의 조건과 동일)
+REQUIRED_FIELDS = ("title", "authors", "abstract")
+
+
+def content_hash(title, authors, abstract):
+    # make_chroma.py의 paper id와 같은 필드를 64비트 정수로 줄여 seen-set을 작게 유지
+    digest = hashlib.blake2b(f"{title}\0{authors}\0{abstract}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
 
 
 class PaperSpiderPipeline:
+    """
+    Normalize, validate and deduplicate the scraped papers, and optionally append them to a JSON Lines file.
+
+    String fields are stripped and runs of whitespace (including non-breaking
+    spaces and newlines) collapse to one space. Papers without a title, authors
+    or abstract are dropped, as are papers whose title, authors and abstract were
+    already seen in this crawl; only a 64-bit hash of each paper is kept.
+
+    When ``PAPER_OUTPUT_FILE`` is set, every paper is appended to it as one JSON
+    line and the file is flushed every ``PAPER_OUTPUT_FLUSH_ITEMS`` papers or
+    ``PAPER_OUTPUT_FLUSH_SECS`` seconds, so readers such as ``make_chroma.py``
+    only ever see whole lines. Papers already in an existing file are loaded
+    into the seen-set first, so a rerun only appends new papers.
+    """
+
+    def __init__(self, output_file=None, flush_items=100, flush_secs=5.0):
+        self.output_file = output_file
+        self.flush_items = flush_items
+        self.flush_secs = flush_secs
+        self.seen = set()
+        self.pending = []
+        self.file = None
+        self.last_flush = time.monotonic()
+        self.flush_loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            output_file=settings.get("PAPER_OUTPUT_FILE"),
+            flush_items=settings.getint("PAPER_OUTPUT_FLUSH_ITEMS", 100),
+            flush_secs=settings.getfloat("PAPER_OUTPUT_FLUSH_SECS", 5.0),
+        )
+
+    def open_spider(self, spider):
+        self.seen = set()
+        if not self.output_file:
+            return
+
+        if os.path.exists(self.output_file):
+            self.load_seen(spider)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_file)), exist_ok=True)
+        self.file = open(self.output_file, 'a', encoding='utf-8')
+
+        # 논문이 뜸하게 들어와도 flush_secs마다 버퍼를 비움
+        from twisted.internet import task
+        self.flush_loop = task.LoopingCall(self.flush)
+        self.flush_loop.start(self.flush_secs, now=False)
+
+    def load_seen(self, spider):
+        valid_size = 0
+        with open(self.output_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 중단된 크롤링이 남긴 마지막 줄의 일부
+                if line.strip():
+                    paper = json.loads(line)
+                    self.seen.add(content_hash(paper.get("title", ""), paper.get("authors", ""), paper.get("abstract", "")))
+                valid_size += len(line)
+        if valid_size < os.path.getsize(self.output_file):
+            spider.logger.warning(f"Removing an incomplete last line from {self.output_file}")
+            os.truncate(self.output_file, valid_size)
+        spider.logger.info(f"Appending to {self.output_file} ({len(self.seen)} papers already there)")
+
+    def close_spider(self, spider):
+        if self.flush_loop is not None and self.flush_loop.running:
+            self.flush_loop.stop()
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
     def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        for field, value in list(adapter.items()):
+            if isinstance(value, str):
+                adapter[field] = " ".join(value.split())
+
+        missing = [field for field in REQUIRED_FIELDS if not adapter.get(field)]
+        if missing:
+            raise DropItem(f"Missing {', '.join(missing)}: {adapter.get('title') or adapter.asdict()}")
+
+        key = content_hash(adapter["title"], adapter["authors"], adapter["abstract"])
+        if key in self.seen:
+            spider.crawler.stats.inc_value("paper/duplicate", spider=spider)
+            raise DropItem(f"Duplicate paper: {adapter['title']}")
+        self.seen.add(key)
+
+        if self.file is not None:
+            self.pending.append(json.dumps(adapter.asdict(), ensure_ascii=False) + "\n")
+            if len(self.pending) >= self.flush_items or time.monotonic() - self.last_flush >= self.flush_secs:
+                self.flush()
         return item
+
+    def flush(self):
+        # 완성된 줄만 한 번에 쓰고 flush
+        if self.pending:
+            self.file.write("".join(self.pending))
+            self.file.flush()
+            self.pending = []
+        self.last_flush = time.monotonic()
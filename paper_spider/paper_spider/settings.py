@@ -62,9 +62,15 @@ ROBOTSTXT_OBEY = True
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "paper_spider.pipelines.PaperSpiderPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "paper_spider.pipelines.PaperSpiderPipeline": 300,
+}
+# 공백 정리, 필수 필드 검사, 중복 제거를 거친 논문을 JSON Lines로 추가할 파일
+# (예: scrapy crawl cvf_paper_spider -s PAPER_OUTPUT_FILE=../data/CVPR_2024.jsonl), 없으면 쓰지 않음
+PAPER_OUTPUT_FILE = None
+# 버퍼에 쌓인 논문을 이 개수나 시간(초)마다 파일에 flush
+PAPER_OUTPUT_FLUSH_ITEMS = 100
+PAPER_OUTPUT_FLUSH_SECS = 5
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -81,11 +87,22 @@ ROBOTSTXT_OBEY = True
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# 응답은 .scrapy/httpcache/{spider}.sqlite3에 압축해 저장하고 (paper_spider/httpcache.py),
+# 유효 기간이 지난 페이지는 ETag/Last-Modified로 재검증함
+HTTPCACHE_ENABLED = True
+HTTPCACHE_EXPIRATION_SECS = 0
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_IGNORE_HTTP_CODES = [403, 404, 408, 429, 500, 502, 503, 504]
+HTTPCACHE_STORAGE = "paper_spider.httpcache.SqliteCacheStorage"
+HTTPCACHE_POLICY = "paper_spider.httpcache.VenueFreshnessPolicy"
+# 검증자(ETag/Last-Modified)가 없는 페이지도 저장하고, 유효 기간은 서버 헤더 대신 아래 값을 사용
+HTTPCACHE_ALWAYS_STORE = True
+HTTPCACHE_IGNORE_RESPONSE_CACHE_CONTROLS = ["no-cache", "no-store", "must-revalidate", "private"]
+# 지난 연도의 proceedings는 거의 바뀌지 않으므로 오래 사용하고, 올해 학회는 하루 뒤 재검증
+HTTPCACHE_FRESHNESS_SECS = 24 * 3600
+HTTPCACHE_ARCHIVE_FRESHNESS_SECS = 90 * 24 * 3600
+# spider별로 덮어쓸 유효 기간 (초), 예: {"iclr_paper_spider": 6 * 3600}
+HTTPCACHE_SPIDER_FRESHNESS_SECS = {}
 
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
@@ -101,8 +118,13 @@ SELENIUM_DRIVER_ARGUMENTS = [
 #     '--no-sandbox',                    # 샌드박스 모드 비활성화
     'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.121 Safari/537.36'  # 사용자 에이전트 설정
 ]
+# SeleniumRequest는 브라우저 풀에서 동시에 렌더링 (paper_spider/browser_pool.py)
+# HTTP 캐시 뒤에 두어 렌더링한 페이지도 캐시에 저장되게 함
+BROWSER_POOL_SIZE = 4
 DOWNLOADER_MIDDLEWARES = {
-   'scrapy_selenium.SeleniumMiddleware': 800
+   'scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware': None,
+   'paper_spider.httpcache.HttpCacheMiddleware': 900,
+   'paper_spider.browser_pool.BrowserPoolMiddleware': 950,
 }
 
 LOG_LEVEL = 'WARNING'
\ No newline at end of file
@@ -6,6 +6,7 @@ class AAAIPaperSpider(scrapy.Spider):
 
     def __init__(self, year=None):
         super(AAAIPaperSpider, self).__init__()
+        self.year = year
 
         self.start_urls = [
             f"https://dblp.org/db/conf/aaai/aaai{year}.html"
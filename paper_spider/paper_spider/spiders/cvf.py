@@ -10,6 +10,7 @@ class CVFPaperSpider(scrapy.Spider):
 
     def __init__(self, conference=None, year=None, *args, **kwargs):
         super(CVFPaperSpider, self).__init__(*args, **kwargs)
+        self.year = year
         self.start_urls = [f"https://openaccess.thecvf.com/{conference}{year}?day=all"]
 
     def parse(self, response):  # noqa
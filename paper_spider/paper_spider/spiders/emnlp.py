@@ -1,18 +1,26 @@
 import scrapy
 
+from paper_spider.fast_mode import parse_flag
+
 
 class EMNLPPaperSpider(scrapy.Spider):
     name = "emnlp_paper_spider"
 
-    def __init__(self, year=None):
+    def __init__(self, year=None, fast=None):
         super(EMNLPPaperSpider, self).__init__()
 
         self.year = year
+        # fast 모드: 학회 목록 페이지에 접혀 있는 초록을 바로 읽고, 초록이 없는 논문만 논문별 페이지를 요청
+        self.fast = parse_flag(fast)
         self.start_urls = [
             f"https://aclanthology.org/events/emnlp-{year}"
         ]
 
     def parse(self, response):
+        if self.fast:
+            yield from self.parse_listing(response)
+            return
+
         if self.year in ['2020', '2021', '2022', '2023']:
             paper_links = response.xpath(f'//*[starts-with(@id, "{self.year}")]/p/span[2]/strong/a/@href').getall()
             # paper_links = response.xpath(f'//*[@id="{self.year}emnlp-main"]/p/span[2]/strong/a/@href').getall()
@@ -28,6 +36,32 @@ class EMNLPPaperSpider(scrapy.Spider):
         paper_links = ["https://aclanthology.org" + '/' + link for link in paper_links]
         yield from response.follow_all(paper_links, self.parse_paper)
 
+    def parse_listing(self, response):
+        id_prefixes = {'2019': 'd19-', '2018': 'w18-'}
+        if self.year not in ['2018', '2019', '2020', '2021', '2022', '2023']:
+            raise NotImplementedError
+        papers = response.xpath(f'//*[starts-with(@id, "{id_prefixes.get(self.year, self.year)}")]/p')
+
+        for paper in papers:
+            link = paper.xpath('./span[2]/strong/a/@href').get()
+            if not link:
+                continue
+            title = ''.join(paper.xpath('./span[2]/strong/a//text()').getall()).strip()
+            authors = ', '.join(paper.xpath('./span[2]/a[starts-with(@href, "/people/")]/text()').getall())
+            # 논문 항목 바로 다음의 접힌 카드에 초록이 있음
+            abstract = ''.join(
+                paper.xpath('./following-sibling::*[1][contains(@class, "abstract-collapse")]//text()').getall()
+            ).strip()
+
+            if abstract:
+                yield {
+                    "title": title,
+                    "authors": authors,
+                    "abstract": abstract,
+                }
+            else:
+                yield response.follow(link, self.parse_paper)
+
     def parse_paper(self, response):  # noqa
         def extract_with_xpath(query):
             return response.xpath(query).get().strip()
@@ -1,12 +1,39 @@
 import scrapy
 
+from paper_spider.fast_mode import VirtualSiteJsonMixin, parse_flag
 
-class ICLRPaperSpider(scrapy.Spider):
+
+# 수집하는 발표 유형 (Schedule 페이지의 카드와 JSON의 eventtype/decision에 공통으로 사용)
+PAPER_TYPES = [
+    'Poster', 'Oral', 'Spotlight Poster', 'Spotlight',
+    # year 2023
+    'In-Person Poster presentation / top 5% paper',
+    'In-Person presentation / poster accept',
+    'Virtual presentation / top 25% paper',
+    'In-Person Poster presentation / top 25% paper',
+    'Virtual Poster presentation / top 5% paper',
+    'Virtual Poster presentation / top 25% paper',
+    'In-Person Poster presentation / poster accept',
+    'Virtual presentation / top 5% paper',
+    'Virtual Poster presentation / poster accept',
+    'In-Person Oral presentation / top 25% paper',
+    'In-Person Oral presentation / top 5% paper',
+    'Virtual presentation / poster accept',
+]
+
+
+class ICLRPaperSpider(VirtualSiteJsonMixin, scrapy.Spider):
     name = "iclr_paper_spider"
+    # fast 모드: 논문별 페이지 대신 virtual site의 JSON 한 개에서 제목, 저자, 초록을 읽음
+    conference_name = "ICLR"
+    site_url = "https://iclr.cc"
+    json_name = "iclr"
+    paper_types = PAPER_TYPES
 
-    def __init__(self, year=None):
+    def __init__(self, year=None, fast=None):
         super(ICLRPaperSpider, self).__init__()
         self.year = year
+        self.fast = parse_flag(fast)
         self.start_urls = [
             f"https://iclr.cc/Conferences/{year}/Schedule"
         ]
@@ -22,21 +49,7 @@ class ICLRPaperSpider(scrapy.Spider):
             title = paper.xpath('./div[3]/text()').get().strip() if paper.xpath('./div[3]/text()').get() else None
             paper_type = paper.xpath('./div[1]/text()').get().strip() if paper.xpath('./div[1]/text()').get() else None
 
-            if paper_type in ['Poster', 'Oral', 'Spotlight Poster', 'Spotlight',
-                # year 2023
-                'In-Person Poster presentation / top 5% paper',
-                'In-Person presentation / poster accept',
-                'Virtual presentation / top 25% paper',
-                'In-Person Poster presentation / top 25% paper',
-                'Virtual Poster presentation / top 5% paper',
-                'Virtual Poster presentation / top 25% paper',
-                'In-Person Poster presentation / poster accept',
-                'Virtual presentation / top 5% paper',
-                'Virtual Poster presentation / poster accept',
-                'In-Person Oral presentation / top 25% paper',
-                'In-Person Oral presentation / top 5% paper',
-                'Virtual presentation / poster accept'
-            ]:
+            if paper_type in PAPER_TYPES:
                 # Make a request to the individual paper page to get the abstract and author info
                 paper_url = f'https://iclr.cc/Conferences/{self.year}/Schedule?showEvent={paper_id}'
                 # Pass the title and paper_id to the next request
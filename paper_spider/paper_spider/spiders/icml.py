@@ -1,11 +1,69 @@
+import re
+
 import scrapy
 
+from paper_spider.fast_mode import parse_flag
+
+_BIBTEX_ENTRY = re.compile(r"@\w+\s*\{\s*([^,\s]+)\s*,")
+_BIBTEX_FIELD = re.compile(r"\s*(\w+)\s*=\s*")
+_BIBTEX_BARE_VALUE = re.compile(r"[^,}\s]+")
+_BIBTEX_SEPARATOR = re.compile(r"\s*,?")
+_BIBTEX_BRACE = re.compile(r"(?<!\\)[{}]")
+
+
+def parse_bibtex(text):
+    """Yield ``(key, fields)`` for every entry of a BibTeX file; field values keep their inner braces."""
+    for entry in _BIBTEX_ENTRY.finditer(text):
+        position = entry.end()
+        fields = {}
+        while True:
+            field = _BIBTEX_FIELD.match(text, position)
+            if not field:
+                break
+            value, position = _read_bibtex_value(text, field.end())
+            fields[field.group(1).lower()] = value
+            position = _BIBTEX_SEPARATOR.match(text, position).end()
+        yield entry.group(1), fields
+
+
+def _read_bibtex_value(text, position):
+    if text.startswith('{', position):
+        depth = 0
+        index = position
+        while index < len(text):
+            char = text[index]
+            if char == '\\':
+                index += 1  # \{, \} 같은 이스케이프는 중괄호로 세지 않음
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[position + 1:index], index + 1
+            index += 1
+        return text[position + 1:], len(text)
+    if text.startswith('"', position):
+        end = text.find('"', position + 1)
+        end = len(text) if end < 0 else end
+        return text[position + 1:end], end + 1
+    value = _BIBTEX_BARE_VALUE.match(text, position)
+    return (value.group(0), value.end()) if value else ('', position)
+
+
+def clean_bibtex(value):
+    # 대소문자 보호용 중괄호를 없애고 (\{, \}는 중괄호로 되돌림) 공백을 정리
+    value = _BIBTEX_BRACE.sub('', value).replace('\\{', '{').replace('\\}', '}')
+    return ' '.join(value.split())
+
 
 class ICMLPaperSpider(scrapy.Spider):
     name = "icml_paper_spider"
 
-    def __init__(self, year=None):
+    def __init__(self, year=None, fast=None):
         super(ICMLPaperSpider, self).__init__()
+        self.year = year
+        # fast 모드: 논문별 페이지 대신 proceedings의 BibTeX 파일 한 개에서 제목, 저자, 초록을 읽음
+        self.fast = parse_flag(fast)
 
         versions = {
             '2024': 'v235',
@@ -20,10 +78,54 @@ class ICMLPaperSpider(scrapy.Spider):
         if not version:
             self.logger.error(f"Invalid year: {year}")
 
+        self.version = version
         self.start_urls = [
             f"https://proceedings.mlr.press/{version}"
         ]
 
+    def start_requests(self):
+        if not self.fast:
+            yield from super().start_requests()
+            return
+        yield scrapy.Request(
+            f"https://proceedings.mlr.press/{self.version}/assets/bib/bibliography.bib",
+            callback=self.parse_bibtex,
+            errback=self.parse_bibtex_failed,
+        )
+
+    def parse_bibtex(self, response):
+        entries = list(parse_bibtex(response.text))
+        if not entries:
+            yield from self.parse_bibtex_failed(None)
+            return
+
+        for key, fields in entries:
+            if 'title' not in fields:
+                continue
+            title = clean_bibtex(fields['title'])
+            # "성, 이름 and 성, 이름" -> "이름 성, 이름 성"
+            authors = []
+            for author in clean_bibtex(fields.get('author', '')).split(' and '):
+                last, _, first = author.partition(',')
+                authors.append(f"{first.strip()} {last.strip()}".strip())
+            authors = ', '.join(author for author in authors if author)
+            abstract = clean_bibtex(fields.get('abstract', ''))
+
+            if abstract:
+                yield {
+                    "title": title,
+                    "authors": authors,
+                    "abstract": abstract,
+                }
+            else:
+                # 초록이 없는 논문만 논문별 페이지에서 가져옴 (key: pmlr-v202-aamand23a)
+                paper_id = key.split(f"pmlr-{self.version}-", 1)[-1]
+                yield scrapy.Request(f"https://proceedings.mlr.press/{self.version}/{paper_id}.html", callback=self.parse_paper)
+
+    def parse_bibtex_failed(self, failure):
+        self.logger.warning(f"No BibTeX file for ICML {self.year}, crawling the proceedings page instead")
+        yield scrapy.Request(self.start_urls[0], callback=self.parse, dont_filter=True)
+
     def parse(self, response):
         paper_links = response.xpath("/html/body/main/div/div[position()>1]/p[3]/a[1]/@href").getall()
         yield from response.follow_all(paper_links, self.parse_paper)
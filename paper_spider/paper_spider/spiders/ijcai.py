@@ -6,6 +6,7 @@ class IJCAIPaperSpider(scrapy.Spider):
 
     def __init__(self, year=None):
         super(IJCAIPaperSpider, self).__init__()
+        self.year = year
 
         self.start_urls = [
             f"https://www.ijcai.org/proceedings/{year}"
@@ -74,11 +74,12 @@ class ISMIRPaperSpider(scrapy.Spider):
             # Iterate over the links and titles, sending a new request to each link to parse the abstract
             for link, title in zip(links, titles):
                 full_link = f"https://ismir{self.year}program.ismir.net/{link}"
+                # 논문 페이지의 초록은 정적 HTML이므로 브라우저 없이 받음
                 yield SeleniumRequest(
                     url=full_link,
                     callback=self.parse_abstract,
                     headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.121 Safari/537.36'},
-                    meta={'title': title}
+                    meta={'title': title, 'render_js': False}
                 )
                 yield SeleniumRequest(
                     url=full_link,
@@ -1,12 +1,26 @@
 import scrapy
 
+from paper_spider.fast_mode import VirtualSiteJsonMixin, parse_flag
 
-class NeurIPSPaperSpider(scrapy.Spider):
+
+# 수집하는 발표 유형 (Schedule 페이지의 카드와 JSON의 eventtype/decision에 공통으로 사용)
+PAPER_TYPES = [
+    'Poster', 'Oral', 'Spotlight Poster', 'Spotlight',
+]
+
+
+class NeurIPSPaperSpider(VirtualSiteJsonMixin, scrapy.Spider):
     name = "neurips_paper_spider"
+    # fast 모드: 논문별 페이지 대신 virtual site의 JSON 한 개에서 제목, 저자, 초록을 읽음
+    conference_name = "NeurIPS"
+    site_url = "https://nips.cc"
+    json_name = "neurips"
+    paper_types = PAPER_TYPES
 
-    def __init__(self, year=None):
+    def __init__(self, year=None, fast=None):
         super(NeurIPSPaperSpider, self).__init__()
         self.year = year
+        self.fast = parse_flag(fast)
         self.start_urls = [
             f"https://nips.cc/Conferences/{year}/Schedule"
         ]
@@ -27,7 +41,7 @@ class NeurIPSPaperSpider(scrapy.Spider):
             #     print('hi')
 
             # Add the paper_type to the set
-            if paper_type in ['Poster', 'Oral', 'Spotlight Poster', 'Spotlight']:
+            if paper_type in PAPER_TYPES:
                 # Make a request to the individual paper page to get the abstract and author info
                 paper_url = f'https://nips.cc/Conferences/{self.year}/Schedule?showEvent={paper_id}'
 
@@ -0,0 +1,89 @@
+import time
+import asyncio
+from collections import OrderedDict
+
+from constants import RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+
+
+class ResultCache:
+    """
+    Short-TTL cache of search responses with single-flight de-duplication.
+
+    Concurrent ``get_or_compute`` calls with the same key share one computation:
+    the first caller starts ``compute()`` and the others await the same task.
+    Results accepted by ``cacheable`` are then kept for ``ttl`` seconds in an LRU
+    bounded by ``maxsize`` entries. Must be used from a single event loop.
+    """
+
+    def __init__(self, ttl=RESULT_CACHE_TTL, maxsize=RESULT_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._results = OrderedDict()  # key -> (expires, value)
+        self._in_flight = {}  # key -> asyncio.Task
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key):
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return value
+
+    def _store(self, key, value):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self._results[key] = (time.monotonic() + self.ttl, value)
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    async def _compute(self, key, compute, cacheable):
+        try:
+            value = await compute()
+        finally:
+            del self._in_flight[key]
+        if cacheable(value):
+            self._store(key, value)
+        return value
+
+    async def get_or_compute(self, key, compute, cacheable=lambda value: True):
+        """
+        Return ``(value, shared)``; ``shared`` is True when the value was computed by another request.
+
+        The computation runs in its own task, so a cancelled caller does not cancel
+        it for the callers still waiting on the same key.
+        """
+        value = self._lookup(key)
+        if value is not None:
+            self.hits += 1
+            return value, True
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._compute(key, compute, cacheable))
+        self._in_flight[key] = task
+        return await asyncio.shield(task), False
+
+    def stats(self):
+        requests = self.hits + self.coalesced + self.misses
+        return {
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "in_flight": len(self._in_flight),
+            "hit_rate": (self.hits + self.coalesced) / requests if requests else 0.0,
+        }
@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+import tiktoken  # OpenAI 토큰화를 위한 라이브러리
+
+from constants import OPENAI_EMBEDDING_MODEL_NAME
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model_name=OPENAI_EMBEDDING_MODEL_NAME):
+    """Load the tiktoken encoder of ``model_name`` once per process."""
+    return tiktoken.encoding_for_model(model_name)
+
+
+def count_tokens(text, model_name=OPENAI_EMBEDDING_MODEL_NAME):
+    # 임베딩 API는 special token을 일반 텍스트로 취급하므로 encode_ordinary 사용
+    return len(get_encoder(model_name).encode_ordinary(text))
+
+
+def count_tokens_batch(texts, num_threads=8, model_name=OPENAI_EMBEDDING_MODEL_NAME):
+    """Count the tokens of every text in ``texts`` with tiktoken's multithreaded batch encoder."""
+    encoded = get_encoder(model_name).encode_ordinary_batch(list(texts), num_threads=num_threads)
+    return [len(tokens) for tokens in encoded]